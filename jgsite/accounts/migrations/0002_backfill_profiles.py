@@ -0,0 +1,33 @@
+from collections import Counter
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def create_profiles(apps, schema_editor):
+    # Users from before profiles existed, with the post counts that
+    # boards.signals has maintained since.
+    User = apps.get_model('auth', 'User')
+    Profile = apps.get_model('accounts', 'Profile')
+    counts = Counter()
+    for model in (apps.get_model('boards', 'Post'), apps.get_model('boards', 'ArchivedPost')):
+        counts.update(dict(
+            model.objects.order_by().values('created_by').annotate(total=Count('pk'))
+            .values_list('created_by', 'total')
+        ))
+    missing = User.objects.filter(profile__isnull=True).values_list('pk', flat=True)
+    Profile.objects.bulk_create(
+        [Profile(user_id=pk, posts_count=counts.get(pk, 0)) for pk in missing], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('boards', '0010_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_profiles, migrations.RunPython.noop),
+    ]
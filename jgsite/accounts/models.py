@@ -1,3 +1,15 @@
 from django.db import models
+from django.contrib.auth.models import User
 
-# Create your models here.
+
+class Profile(models.Model):
+    '''
+    Per-user data kept next to auth.User. `posts_count` is maintained by
+    boards.signals on every new or deleted post, and
+    `manage.py reconcile_posts_count` recomputes it.
+    '''
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='profile')
+    posts_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return str(self.user)
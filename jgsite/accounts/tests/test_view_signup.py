@@ -1,7 +1,7 @@
 from django.contrib.auth.models import User
 #from django.contrib.auth.forms import UserCreationForm
 from django.urls import resolve, reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from ..views import signup
 from ..forms import SignUpForm
 
@@ -34,6 +34,7 @@ class SignUpTests(TestCase):
         self.assertContains(self.response, 'type="email"', 1)
         self.assertContains(self.response, 'type="password"', 2)
         
+@override_settings(RATELIMIT_ENABLE=False)
 class SuccessfulSignUpTests(TestCase):
     def setUp(self):
         url = reverse('accounts:signup')
@@ -65,6 +66,7 @@ class SuccessfulSignUpTests(TestCase):
         user = response.context.get('user')
         self.assertTrue(user.is_authenticated)
         
+@override_settings(RATELIMIT_ENABLE=False)
 class InvalidSignUpTests(TestCase):
     def setUp(self):
         url = reverse('accounts:signup')
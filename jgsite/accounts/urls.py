@@ -1,10 +1,13 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
 from django.urls import reverse_lazy
+from jgsite.ratelimit import ratelimit
 from . import views
 
 # Class-based password reset views
-# - PasswordResetView sends the mail
+# - PasswordResetView sends the mail; with EMAIL_BACKEND set to
+#   'boards.mail.QueueBackend' it is only queued, and sent later by
+#   `manage.py send_queued_mail`
 # - PasswordResetDoneView shows a success message for the above
 # - PasswordResetConfirmView checks the link the user clicked and
 #   prompts for a new password
@@ -13,7 +16,9 @@ from . import views
 app_name = 'accounts'
 urlpatterns = [
     path('signup/', views.signup, name='signup'),
-    path('login/', auth_views.LoginView.as_view(template_name='accounts/login.html'), name='login'),
+    path('login/',
+        ratelimit('login', ip='10/m')(auth_views.LoginView.as_view(template_name='accounts/login.html')),
+        name='login'),
     path('logout/', auth_views.LogoutView.as_view(), name='logout'),
     
     path('password/change/', 
@@ -1,7 +1,10 @@
 from django.contrib.auth import login
 from django.shortcuts import render, redirect
+from jgsite.ratelimit import ratelimit
+
 from .forms import SignUpForm
 
+@ratelimit('signup', ip='5/h')
 def signup(request):
     if request.method == 'POST':
         form = SignUpForm(request.POST)
@@ -0,0 +1,130 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import condition
+
+from .models import Board, Post, Topic
+from .viewcounts import record_view
+from .views import get_page
+
+# Read-only JSON mirrors of `home`, `board_topics` and `topic_posts`. They
+# select only the columns they return, paginate with the same keyset
+# cursors as the HTML pages, and answer conditional GETs: the ETag and
+# Last-Modified of a resource come from one small query over the stored
+# Topic.last_updated and counters, so an unchanged resource is a 304
+# without loading its rows. Topic view counts are left out of the
+# payloads: their write-behind flush does not touch last_updated, so a
+# client would keep a stale count behind a 304.
+
+
+def conditional(freshness):
+    '''
+    `condition()` with the ETag and Last-Modified both taken from a single
+    call to `freshness(request, **kwargs)`, which returns the resource's
+    last modification time and a tuple of values that change with it.
+    '''
+    def get(request, **kwargs):
+        if not hasattr(request, '_api_freshness'):
+            last_modified, state = freshness(request, **kwargs)
+            key = '|'.join(str(value) for value in (request.get_full_path(), last_modified) + tuple(state))
+            request._api_freshness = (hashlib.md5(key.encode()).hexdigest(), last_modified)
+        return request._api_freshness
+
+    return condition(
+        etag_func=lambda request, **kwargs: get(request, **kwargs)[0],
+        last_modified_func=lambda request, **kwargs: get(request, **kwargs)[1],
+    )
+
+
+def page_urls(page, name, **kwargs):
+    def url(cursor):
+        return reverse(name, kwargs=dict(kwargs, cursor=cursor)) if cursor else None
+    return {'next': url(page.next_cursor), 'previous': url(page.previous_cursor)}
+
+
+def boards_freshness(request):
+    rows = list(Board.objects.order_by('pk').values_list(
+        'pk', 'posts_count', 'topics_count', 'last_post', 'last_post__created_at'
+    ))
+    last_modified = max((row[4] for row in rows if row[4]), default=None)
+    return last_modified, [row[:4] for row in rows]
+
+
+def board_freshness(request, board_id, cursor=None):
+    latest = Topic.objects.filter(board=OuterRef('pk')).order_by('-last_updated').values('last_updated')[:1]
+    row = Board.objects.filter(pk=board_id).annotate(last_updated=Subquery(latest)).values_list(
+        'last_updated', 'posts_count', 'topics_count', 'last_post'
+    ).first()
+    if row is None:
+        raise Http404('No Board matches the given query.')
+    return row[0], row[1:]
+
+
+def topic_freshness(request, board_id, topic_id, cursor=None):
+    row = Topic.objects.filter(board__pk=board_id, pk=topic_id).values_list(
+        'last_updated', 'posts_count', 'last_post'
+    ).first()
+    if row is None:
+        raise Http404('No Topic matches the given query.')
+    return row[0], row[1:]
+
+
+@conditional(boards_freshness)
+def boards(request):
+    rows = Board.objects.order_by('pk').values(
+        'id', 'name', 'description', 'topics_count', 'posts_count',
+        'last_post', 'last_post__created_at', 'last_post__created_by__username',
+    )
+    return JsonResponse({'boards': [{
+        'id': row['id'],
+        'name': row['name'],
+        'description': row['description'],
+        'topics_count': row['topics_count'],
+        'posts_count': row['posts_count'],
+        'last_post': {
+            'id': row['last_post'],
+            'created_at': row['last_post__created_at'],
+            'created_by': row['last_post__created_by__username'],
+        } if row['last_post'] else None,
+    } for row in rows]})
+
+
+@conditional(board_freshness)
+def board_topics(request, board_id, cursor=None):
+    # board_freshness has already answered 404 for a missing board.
+    topics = Topic.objects.filter(board_id=board_id).select_related('starter').only(
+        'subject', 'last_updated', 'posts_count', 'starter__username',
+    )
+    per_page = getattr(settings, 'BOARDS_TOPICS_PER_PAGE', 20)
+    page = get_page(topics, 'last_updated', per_page, cursor, descending=True)
+    data = {'topics': [{
+        'id': topic.pk,
+        'subject': topic.subject,
+        'starter': topic.starter.username,
+        'replies': topic.get_replies_count(),
+        'last_updated': topic.last_updated,
+    } for topic in page]}
+    data.update(page_urls(page, 'boards:api_board_topics_page', board_id=board_id))
+    return JsonResponse(data)
+
+
+@conditional(topic_freshness)
+def topic_posts(request, board_id, topic_id, cursor=None):
+    record_view(topic_id)
+    posts = Post.objects.filter(topic_id=topic_id).select_related('created_by').only(
+        'message', 'created_at', 'updated_at', 'created_by__username',
+    )
+    per_page = getattr(settings, 'BOARDS_POSTS_PER_PAGE', 20)
+    page = get_page(posts, 'created_at', per_page, cursor)
+    data = {'posts': [{
+        'id': post.pk,
+        'message': post.message,
+        'created_by': post.created_by.username,
+        'created_at': post.created_at,
+        'updated_at': post.updated_at,
+    } for post in page]}
+    data.update(page_urls(page, 'boards:api_topic_posts_page', board_id=board_id, topic_id=topic_id))
+    return JsonResponse(data)
@@ -0,0 +1,80 @@
+from django.db import transaction
+from django.db.models import OuterRef
+
+from . import search, signals
+from .cache import INDEX, board_scope, bump_versions
+from .models import ArchivedPost, ArchivedTopic, Board, Post, Topic
+
+# Archiving keeps the Topic and Post tables down to the threads people
+# still read and write. `manage.py archive_topics` moves topics without
+# posts for BOARDS_ARCHIVE_AFTER_DAYS days, with their posts, into
+# ArchivedTopic and ArchivedPost under their original ids, a batch of
+# topics per transaction. topic_posts and archived_topics serve them
+# read-only from there.
+#
+# Board post and topic counts and the authors' post counts keep counting
+# archived content, so the signal receivers that would decrement them
+# are suspended while the rows are deleted; subscriptions, read markers
+# and notifications of archived topics are deleted with them. Archived
+# posts leave the search index. export_boards and import_boards carry
+# archived topics and posts, marked as such.
+
+POST_FIELDS = ('id', 'message', 'message_html', 'topic_id', 'created_at', 'updated_at', 'created_by_id', 'updated_by_id')
+
+
+def archive_batch(cutoff, batch_size=100):
+    '''
+    Move up to `batch_size` topics last updated before `cutoff` into the
+    archive, in one transaction. Return the numbers of topics and posts
+    moved.
+    '''
+    return move_topics(Topic.objects.filter(last_updated__lt=cutoff).order_by('pk')[:batch_size])
+
+
+def move_topics(queryset):
+    '''
+    Move the topics of `queryset`, with their posts, into the archive in
+    one transaction. Return the numbers of topics and posts moved.
+    '''
+    with transaction.atomic(), signals.suspended():
+        topics = list(queryset.select_for_update())
+        if not topics:
+            return 0, 0
+        ArchivedTopic.objects.bulk_create([
+            ArchivedTopic(
+                id=topic.pk, subject=topic.subject, last_updated=topic.last_updated, board_id=topic.board_id,
+                starter_id=topic.starter_id, views=topic.views, posts_count=topic.posts_count,
+            )
+            for topic in topics
+        ])
+        topic_ids = [topic.pk for topic in topics]
+        post_ids = []
+        posts = Post.objects.filter(topic__in=topic_ids).order_by('pk').values_list(*POST_FIELDS)
+        archived = []
+        for values in posts.iterator(chunk_size=1000):
+            archived.append(ArchivedPost(**dict(zip(POST_FIELDS, values))))
+            post_ids.append(values[0])
+            if len(archived) == 1000:
+                ArchivedPost.objects.bulk_create(archived)
+                archived = []
+        ArchivedPost.objects.bulk_create(archived)
+        Topic.objects.filter(pk__in=topic_ids).delete()
+        search.remove_posts(post_ids)
+        board_ids = {topic.board_id for topic in topics}
+        # on_delete=SET_NULL cleared any last_post that was archived.
+        Board.objects.filter(pk__in=board_ids, last_post__isnull=True).update(
+            last_post=signals.latest_post_id(topic__board=OuterRef('pk'))
+        )
+    bump_versions(INDEX, *[board_scope(pk) for pk in board_ids])
+    return len(topics), len(post_ids)
+
+
+def archive_topics(cutoff, batch_size=100):
+    '''Archive every topic last updated before `cutoff`, batch by batch.'''
+    topics = posts = 0
+    while True:
+        moved_topics, moved_posts = archive_batch(cutoff, batch_size)
+        if not moved_topics:
+            return topics, posts
+        topics += moved_topics
+        posts += moved_posts
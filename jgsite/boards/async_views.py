@@ -0,0 +1,103 @@
+import django
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import render
+
+from .models import ArchivedTopic, Board, Subscription, Topic
+from .pagination import InvalidCursor, KeysetPaginator
+from .readmarkers import mark_read
+from .viewcounts import record_view
+
+try:
+    from asgiref.sync import sync_to_async
+except ImportError:  # Django < 3.0 does not depend on asgiref
+    sync_to_async = None
+
+# Async versions of the read views, served under boards/async/ when the
+# project runs under ASGI (jgsite/asgi.py) on Django 3.1 or later. While a
+# query is in flight the event loop serves other requests instead of
+# blocking a worker thread. Queries use the async ORM on Django 4.1+ and
+# fall back to sync_to_async on older versions. Templates render in a
+# thread, since context processors such as `auth` may still hit the
+# database. The anonymous page cache of the sync views is not applied.
+
+ASYNC_VIEWS = django.VERSION >= (3, 1)
+ASYNC_ORM = django.VERSION >= (4, 1)
+
+
+async def fetch_all(queryset):
+    if ASYNC_ORM:
+        return [obj async for obj in queryset]
+    return await sync_to_async(list)(queryset)
+
+
+async def fetch_one(queryset, **kwargs):
+    model = queryset.model
+    try:
+        if ASYNC_ORM:
+            return await queryset.aget(**kwargs)
+        return await sync_to_async(queryset.get)(**kwargs)
+    except model.DoesNotExist:
+        raise Http404('No {0} matches the given query.'.format(model._meta.object_name))
+
+
+async def get_topic(board_id, topic_id):
+    '''The async `views.get_topic`: the topic, and whether it was archived.'''
+    try:
+        return await fetch_one(Topic.objects.select_related('board'), board__pk=board_id, pk=topic_id), False
+    except Http404:
+        topics = ArchivedTopic.objects.select_related('board')
+        return await fetch_one(topics, board__pk=board_id, pk=topic_id), True
+
+
+async def exists(queryset):
+    if ASYNC_ORM:
+        return await queryset.aexists()
+    return await sync_to_async(queryset.exists)()
+
+
+async def get_user(request):
+    # request.user is loaded lazily from the session, with queries, so
+    # load it in a thread before the async code touches it.
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+async def get_page(queryset, field, per_page, cursor, descending=False):
+    paginator = KeysetPaginator(queryset, field, per_page, descending=descending)
+    try:
+        direction, queryset = paginator.get_queryset(cursor)
+        return paginator.make_page(direction, await fetch_all(queryset), cursor)
+    except InvalidCursor:
+        raise Http404('Invalid page cursor.')
+
+
+async def home(request):
+    boards = await fetch_all(Board.objects.with_stats().order_by('pk'))
+    return await sync_to_async(render)(request, 'boards/home.html', {'boards': boards})
+
+
+async def board_topics(request, board_id, cursor=None):
+    board = await fetch_one(Board.objects.all(), pk=board_id)
+    per_page = getattr(settings, 'BOARDS_TOPICS_PER_PAGE', 20)
+    topics = board.topics.select_related('starter').with_unread(await get_user(request))
+    topics = await get_page(topics, 'last_updated', per_page, cursor, descending=True)
+    return await sync_to_async(render)(request, 'boards/topics.html', {'board': board, 'topics': topics})
+
+
+async def topic_posts(request, board_id, topic_id, cursor=None):
+    topic, archived = await get_topic(board_id, topic_id)
+    if not archived:
+        await sync_to_async(record_view)(topic.pk)
+    per_page = getattr(settings, 'BOARDS_POSTS_PER_PAGE', 20)
+    posts = await get_page(topic.posts.select_related('created_by__profile'), 'created_at', per_page, cursor)
+    user = await get_user(request)
+    if posts and not archived:
+        await sync_to_async(mark_read)(user, topic.pk, max(post.pk for post in posts))
+    subscribed = (
+        not archived and user.is_authenticated
+        and await exists(Subscription.objects.filter(topic=topic, user=user))
+    )
+    return await sync_to_async(render)(request, 'boards/topic_posts.html', {
+        'topic': topic, 'posts': posts, 'subscribed': subscribed, 'archived': archived,
+    })
@@ -0,0 +1,368 @@
+import asyncio
+import datetime
+import io
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import async_views
+from .models import Board, Post, Topic
+from .pagination import NEXT, encode_cursor
+
+# Benchmark harness for the boards views: `seed` fills the database with a
+# synthetic forum through batched bulk inserts, `run` drives each view
+# through the Django test client and records latency percentiles, queries
+# per request and peak Python memory, and `compare` checks a run against
+# a stored baseline. `throughput` instead measures requests per second
+# under concurrent load through the real WSGI or ASGI handler, to compare
+# the sync views with boards.async_views. See the seed_boards,
+# benchmark_boards and benchmark_asgi commands.
+
+BENCHMARK_USER = 'benchmark'
+PERCENTILES = (50, 90, 95, 99)
+
+
+def seed(boards=100, topics=1000000, posts=10000000, users=1000, chunk_size=10000, seed=0, log=None):
+    '''
+    Insert `boards` boards, `topics` topics and `posts` posts written by
+    `users` users. Replies are skewed towards the first topics, so like
+    on a real forum a few threads get very long.
+    '''
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    now = timezone.now()
+    start = now - datetime.timedelta(days=365)
+    step = (now - start) / max(posts, 1)
+
+    user_ids = create_users(users)
+    first_board = Board.objects.count()
+    Board.objects.bulk_create([
+        Board(name='Board {0}'.format(first_board + i), description='Synthetic board {0}.'.format(i))
+        for i in range(boards)
+    ])
+    board_ids = list(Board.objects.order_by('-pk').values_list('pk', flat=True)[:boards])
+
+    # Explicit primary keys let posts refer to topics without reading
+    # back the ids bulk_create does not return on every backend.
+    first_topic = (Topic.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+    first_post = (Post.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+    created_at = Post._meta.get_field('created_at')
+    created_at.auto_now_add = False
+    try:
+        for offset in range(0, topics, chunk_size):
+            batch = range(offset, min(offset + chunk_size, topics))
+            with transaction.atomic():
+                Topic.objects.bulk_create([
+                    Topic(
+                        id=first_topic + i,
+                        subject='Synthetic topic {0}'.format(i),
+                        board_id=board_ids[i % len(board_ids)],
+                        starter_id=rng.choice(user_ids),
+                        last_updated=start,
+                        views=rng.randint(0, 1000),
+                    )
+                    for i in batch
+                ], batch_size=chunk_size)
+            log('{0} topics'.format(batch.stop))
+        for offset in range(0, posts, chunk_size):
+            batch = range(offset, min(offset + chunk_size, posts))
+            with transaction.atomic():
+                Post.objects.bulk_create([
+                    Post(
+                        id=first_post + i,
+                        # Every topic gets its opening post first, replies
+                        # then favour low topic numbers with a long tail.
+                        topic_id=first_topic + (i if i < topics else int(topics * rng.random() ** 3)),
+                        message='Synthetic post {0}. Lorem ipsum dolor sit amet.'.format(i),
+                        # What boards.markup renders this plain paragraph to.
+                        message_html='<p>Synthetic post {0}. Lorem ipsum dolor sit amet.</p>'.format(i),
+                        created_by_id=rng.choice(user_ids),
+                        created_at=start + step * i,
+                    )
+                    for i in batch
+                ], batch_size=chunk_size)
+            log('{0} posts'.format(batch.stop))
+    finally:
+        created_at.auto_now_add = True
+
+
+def create_users(count):
+    existing = set(User.objects.filter(username__startswith='synthetic').values_list('username', flat=True))
+    users = []
+    for i in range(count):
+        username = 'synthetic{0}'.format(i)
+        if username not in existing:
+            # Unusable passwords skip the deliberately slow password hasher.
+            user = User(username=username)
+            user.set_unusable_password()
+            users.append(user)
+    User.objects.bulk_create(users, batch_size=1000)
+    return list(User.objects.filter(username__startswith='synthetic').values_list('pk', flat=True)[:count])
+
+
+def scenarios():
+    '''
+    Yield `(name, method, url, data, authenticated)` for every benchmarked
+    request against the current contents of the database.
+    '''
+    board = Board.objects.order_by('-topics_count').first()
+    topic = Topic.objects.order_by('-posts_count').first()
+    if board is None or topic is None:
+        raise ValueError('Nothing to benchmark: seed the database first.')
+    oldest = board.topics.order_by('last_updated', 'pk').first()
+    deep_cursor = encode_cursor(NEXT, oldest.last_updated, oldest.pk + 1)
+    topic_kwargs = {'board_id': topic.board_id, 'topic_id': topic.pk}
+    yield 'home', 'get', reverse('boards:home'), None, False
+    yield 'board_topics', 'get', reverse('boards:board_topics', kwargs={'board_id': board.pk}), None, False
+    yield 'board_topics_deep', 'get', reverse('boards:board_topics_page', kwargs={
+        'board_id': board.pk, 'cursor': deep_cursor,
+    }), None, False
+    yield 'topic_posts', 'get', reverse('boards:topic_posts', kwargs=topic_kwargs), None, False
+    yield 'reply_topic', 'get', reverse('boards:reply_topic', kwargs=topic_kwargs), None, True
+    yield 'reply_topic_post', 'post', reverse('boards:reply_topic', kwargs=topic_kwargs), \
+        {'message': 'Benchmark reply.'}, True
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(int(math.ceil(percent / 100 * len(ordered))) - 1, 0)
+    return ordered[index]
+
+
+def measure(client, method, url, data, requests, warmup):
+    request = getattr(client, method)
+
+    def send():
+        response = request(url, data)
+        if response.status_code >= 400:
+            raise ValueError('{0} {1} returned {2}'.format(method.upper(), url, response.status_code))
+
+    for _ in range(warmup):
+        send()
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        send()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    # Counting queries and tracing allocations slow requests down, so they
+    # get their own, shorter pass that is not timed.
+    queries, peak = [], 0
+    tracemalloc.start()
+    try:
+        for _ in range(min(requests, 10)):
+            tracemalloc.clear_traces()
+            with CaptureQueriesContext(connection) as context:
+                send()
+            queries.append(len(context))
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+
+    result = {'requests': requests, 'mean_ms': sum(latencies) / len(latencies), 'max_ms': max(latencies)}
+    for percent in PERCENTILES:
+        result['p{0}_ms'.format(percent)] = percentile(latencies, percent)
+    result['queries_per_request'] = sum(queries) / len(queries)
+    result['peak_memory_kb'] = peak / 1024
+    return result
+
+
+def run(requests=100, warmup=5, authenticated=False, only=None):
+    '''
+    Benchmark every scenario and return the results as a JSON-ready dict.
+    With `authenticated`, read views are requested as a logged-in user,
+    which bypasses the anonymous page cache.
+    '''
+    user, _ = User.objects.get_or_create(username=BENCHMARK_USER)
+    anonymous, logged_in = Client(), Client()
+    results = {}
+    # The reply_topic scenario posts far faster than any user may.
+    with override_settings(ALLOWED_HOSTS=['testserver'] + list(settings.ALLOWED_HOSTS), RATELIMIT_ENABLE=False):
+        logged_in.force_login(user)
+        for name, method, url, data, needs_login in scenarios():
+            if only and name not in only:
+                continue
+            client = logged_in if needs_login or authenticated else anonymous
+            results[name] = measure(client, method, url, data, requests, warmup)
+            results[name]['url'] = url
+    return {
+        'meta': {
+            'created': timezone.now().isoformat(),
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'authenticated': authenticated,
+            'boards': Board.objects.count(),
+            'topics': Topic.objects.count(),
+            'posts': Post.objects.count(),
+        },
+        'views': results,
+    }
+
+
+def interface_scenarios():
+    '''
+    Yield `(name, sync_url, async_url)` for every read view that has an
+    async version.
+    '''
+    board = Board.objects.order_by('-topics_count').first()
+    topic = Topic.objects.order_by('-posts_count').first()
+    if board is None or topic is None:
+        raise ValueError('Nothing to benchmark: seed the database first.')
+    topic_kwargs = {'board_id': topic.board_id, 'topic_id': topic.pk}
+    yield 'home', reverse('boards:home'), reverse('boards:async_home')
+    yield 'board_topics', reverse('boards:board_topics', kwargs={'board_id': board.pk}), \
+        reverse('boards:async_board_topics', kwargs={'board_id': board.pk})
+    yield 'topic_posts', reverse('boards:topic_posts', kwargs=topic_kwargs), \
+        reverse('boards:async_topic_posts', kwargs=topic_kwargs)
+
+
+def wsgi_requests(path, requests, concurrency, cookie):
+    handler = WSGIHandler()
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'SCRIPT_NAME': '', 'QUERY_STRING': '',
+        'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_COOKIE': cookie, 'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+    }
+
+    def send(_):
+        statuses = []
+        body = handler(dict(environ, **{'wsgi.input': io.BytesIO()}), lambda status, headers, *args: statuses.append(status))
+        try:
+            b''.join(body)
+        finally:
+            body.close()
+        return int(statuses[0].split()[0])
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(send, range(requests)))
+
+
+def asgi_requests(path, requests, concurrency, cookie):
+    from django.core.handlers.asgi import ASGIHandler
+
+    handler = ASGIHandler()
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+
+    async def send_one(semaphore):
+        async with semaphore:
+            messages, received = [], asyncio.Event()
+
+            async def receive():
+                if received.is_set():
+                    # No disconnect: wait until the handler gives up listening.
+                    await asyncio.Event().wait()
+                received.set()
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+            async def send(message):
+                messages.append(message)
+
+            await handler(dict(scope), receive, send)
+            return messages[0]['status']
+
+    async def send_all():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*[send_one(semaphore) for _ in range(requests)])
+
+    return asyncio.run(send_all())
+
+
+def throughput(requests=500, concurrency=20, only=None):
+    '''
+    Measure requests per second for every read view with `concurrency`
+    requests in flight: the sync view behind the WSGI handler, the same
+    view behind the ASGI handler, and its async version behind the ASGI
+    handler. Requests are made as a logged-in user so that neither side
+    is served from the anonymous page cache.
+    '''
+    if not async_views.ASYNC_VIEWS:
+        raise ValueError('Async views need Django 3.1 or later, this is {0}.'.format(django.get_version()))
+    user, _ = User.objects.get_or_create(username=BENCHMARK_USER)
+    client = Client()
+    client.force_login(user)
+    cookie = '{0}={1}'.format(settings.SESSION_COOKIE_NAME, client.cookies[settings.SESSION_COOKIE_NAME].value)
+    results = {}
+    with override_settings(ALLOWED_HOSTS=['testserver'] + list(settings.ALLOWED_HOSTS)):
+        for name, sync_url, async_url in interface_scenarios():
+            if only and name not in only:
+                continue
+            results[name] = {}
+            for mode, send, url in (
+                ('wsgi', wsgi_requests, sync_url),
+                ('asgi_sync', asgi_requests, sync_url),
+                ('asgi_async', asgi_requests, async_url),
+            ):
+                started = time.perf_counter()
+                statuses = send(url, requests, concurrency, cookie)
+                elapsed = time.perf_counter() - started
+                results[name][mode] = {
+                    'url': url,
+                    'requests_per_second': requests / elapsed,
+                    'errors': sum(1 for status in statuses if status >= 400),
+                }
+    return {
+        'meta': {
+            'created': timezone.now().isoformat(),
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'requests': requests,
+            'concurrency': concurrency,
+        },
+        'views': results,
+    }
+
+
+def compare(results, baseline, tolerance=0.2, metric='p95_ms'):
+    '''
+    Return a list of human readable regressions of `results` against
+    `baseline`: `metric` slower by more than `tolerance`, or more queries
+    per request than before.
+    '''
+    regressions = []
+    for name, current in results['views'].items():
+        previous = baseline['views'].get(name)
+        if previous is None:
+            continue
+        if current[metric] > previous[metric] * (1 + tolerance):
+            regressions.append('{0}: {1} {2:.1f}ms -> {3:.1f}ms'.format(
+                name, metric, previous[metric], current[metric]
+            ))
+        if current['queries_per_request'] > previous['queries_per_request']:
+            regressions.append('{0}: queries per request {1:g} -> {2:g}'.format(
+                name, previous['queries_per_request'], current['queries_per_request']
+            ))
+    return regressions
+
+
+def load(path):
+    with open(path) as results:
+        return json.load(results)
+
+
+def save(results, path):
+    with open(path, 'w') as output:
+        json.dump(results, output, indent=2, sort_keys=True)
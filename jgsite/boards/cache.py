@@ -0,0 +1,82 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Full-page cache for anonymous readers, invalidated by version numbers
+# rather than timers. Every page is cached under the current versions of
+# the scopes it depends on: 'index' for the board list and 'board:<id>'
+# for one board. Writes bump those versions (see `boards.signals`), which
+# makes every page built from older content unreachable at once; the
+# orphaned entries simply age out of the cache backend. Any Django cache
+# backend works, selected with BOARDS_PAGE_CACHE_ALIAS.
+
+INDEX = 'index'
+
+
+def board_scope(board_id):
+    return 'board:{0}'.format(board_id)
+
+
+def get_cache():
+    return caches[getattr(settings, 'BOARDS_PAGE_CACHE_ALIAS', 'default')]
+
+
+def version_key(scope):
+    return 'boards:version:{0}'.format(scope)
+
+
+def initial_version():
+    # Start from the clock, not 1, so a version key evicted from the cache
+    # never restarts at a number older pages were stored under.
+    return int(time.time() * 1000)
+
+
+def get_versions(scopes):
+    cache = get_cache()
+    keys = [version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, initial_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*scopes):
+    cache = get_cache()
+    for scope in scopes:
+        key = version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, initial_version(), None)
+
+
+def versioned_cache_page(get_scopes):
+    '''
+    Cache the full response of a view for anonymous GET requests.
+    `get_scopes` receives the view's URL arguments and returns the scopes
+    whose versions the page depends on.
+    '''
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            versions = get_versions(get_scopes(*args, **kwargs))
+            key = 'boards:page:{0}:{1}'.format(
+                hashlib.md5(request.get_full_path().encode()).hexdigest(),
+                '.'.join(str(version) for version in versions),
+            )
+            cache = get_cache()
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.streaming and not response.cookies:
+                    cache.set(key, response, None)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,171 @@
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+# Opt-in per-request instrumentation. Add
+# 'boards.instrumentation.InstrumentationMiddleware' to MIDDLEWARE and a
+# sample of requests (BOARDS_INSTRUMENTATION_SAMPLE_RATE, 0.0 to 1.0) will
+# record query count, SQL time, duplicate queries, template render time and
+# view time. Sampled responses carry a Server-Timing header, and the last
+# BOARDS_INSTRUMENTATION_WINDOW samples per URL name are kept in process for
+# the staff-only `boards:request_stats` page. Requests that are not sampled
+# only pay for one random() call.
+
+DEFAULT_SAMPLE_RATE = 0.1
+DEFAULT_WINDOW = 1000
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+_samples = defaultdict(lambda: deque(maxlen=getattr(settings, 'BOARDS_INSTRUMENTATION_WINDOW', DEFAULT_WINDOW)))
+_duplicates = defaultdict(Counter)
+
+PLACEHOLDER_LIST = re.compile(r'%s(?:\s*,\s*%s)+')
+
+
+def fingerprint(sql):
+    '''
+    Queries are already parametrised, so the SQL text identifies the query
+    shape. IN lists of different lengths are folded together.
+    '''
+    return PLACEHOLDER_LIST.sub('%s, ...', sql)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = Counter()
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries[fingerprint(sql)] += 1
+
+    @property
+    def query_count(self):
+        return sum(self.queries.values())
+
+    def duplicates(self):
+        return {sql: count for sql, count in self.queries.items() if count > 1}
+
+
+_original_render = Template.render
+
+
+def timed_render(self, context):
+    '''
+    Template.render replacement. Only the outermost render of a sampled
+    request is timed so that includes and extends are not counted twice.
+    '''
+    metrics = getattr(_local, 'metrics', None)
+    if metrics is None:
+        return _original_render(self, context)
+    outermost = not metrics.template_depth
+    metrics.template_depth += 1
+    start = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        metrics.template_depth -= 1
+        if outermost:
+            metrics.template_time += time.perf_counter() - start
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        Template.render = timed_render
+
+    def __call__(self, request):
+        if random.random() >= getattr(settings, 'BOARDS_INSTRUMENTATION_SAMPLE_RATE', DEFAULT_SAMPLE_RATE):
+            return self.get_response(request)
+        metrics = _local.metrics = RequestMetrics()
+        request._instrumentation_view_start = None
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _local.metrics = None
+        end = time.perf_counter()
+        view_start = request._instrumentation_view_start
+        timings = {
+            'total': end - start,
+            'view': end - view_start if view_start is not None else 0.0,
+            'sql': metrics.sql_time,
+            'template': metrics.template_time,
+            'queries': metrics.query_count,
+        }
+        duplicates = metrics.duplicates()
+        response['Server-Timing'] = ', '.join([
+            'sql;dur={0:.2f};desc="{1} queries, {2} duplicated"'.format(
+                timings['sql'] * 1000, timings['queries'], sum(duplicates.values()) - len(duplicates)
+            ),
+            'template;dur={0:.2f}'.format(timings['template'] * 1000),
+            'view;dur={0:.2f}'.format(timings['view'] * 1000),
+            'total;dur={0:.2f}'.format(timings['total'] * 1000),
+        ])
+        match = request.resolver_match
+        record(match.view_name if match else 'unresolved', timings, duplicates)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(_local, 'metrics', None) is not None:
+            request._instrumentation_view_start = time.perf_counter()
+
+
+def record(name, timings, duplicates):
+    with _stats_lock:
+        _samples[name].append(timings)
+        _duplicates[name].update(duplicates)
+
+
+def reset():
+    with _stats_lock:
+        _samples.clear()
+        _duplicates.clear()
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(int(math.ceil(percent / 100 * len(ordered))) - 1, 0)
+    return ordered[index]
+
+
+def summary():
+    '''
+    p50, p95 and p99 of every timing per URL name, in milliseconds, plus
+    the most repeated query fingerprints.
+    '''
+    with _stats_lock:
+        samples = {name: list(values) for name, values in _samples.items()}
+        duplicates = {name: counter.most_common(5) for name, counter in _duplicates.items()}
+    stats = {}
+    for name, values in sorted(samples.items()):
+        entry = {'samples': len(values)}
+        for key in ('total', 'view', 'sql', 'template'):
+            timings = [value[key] * 1000 for value in values]
+            entry[key + '_ms'] = {
+                'p50': round(percentile(timings, 50), 2),
+                'p95': round(percentile(timings, 95), 2),
+                'p99': round(percentile(timings, 99), 2),
+            }
+        queries = [value['queries'] for value in values]
+        entry['queries'] = {'p50': percentile(queries, 50), 'p95': percentile(queries, 95), 'p99': percentile(queries, 99)}
+        entry['duplicate_queries'] = [{'sql': sql, 'count': count} for sql, count in duplicates.get(name, [])]
+        stats[name] = entry
+    return stats
@@ -0,0 +1,131 @@
+import email
+import email.message
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+# Outbound mail queue. With EMAIL_BACKEND = 'boards.mail.QueueBackend',
+# sending mail (password resets, notifications) only inserts the rendered
+# messages into QueuedEmail, inside the request's transaction, and
+# `manage.py send_queued_mail` delivers them later in batches over one
+# connection of BOARDS_MAIL_QUEUE_BACKEND (SMTP by default). Failed
+# messages are retried after BOARDS_MAIL_QUEUE_RETRY_DELAY seconds,
+# doubling after each attempt, and are given up after
+# BOARDS_MAIL_QUEUE_MAX_ATTEMPTS attempts or a permanent SMTP error.
+#
+# To watch the mail locally, run a debugging SMTP server such as
+# `python -m aiosmtpd -n -l localhost:1025` and the worker with
+# EMAIL_HOST = 'localhost' and EMAIL_PORT = 1025.
+
+DEFAULT_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=getattr(settings, 'BOARDS_MAIL_QUEUE_RETRY_DELAY', 60) * 2 ** (attempts - 1))
+
+
+def permanent(error):
+    '''Whether retrying cannot help, e.g. every recipient was refused.'''
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+class QueueBackend(BaseEmailBackend):
+    '''Email backend that stores messages in the queue instead of sending them.'''
+    def send_messages(self, email_messages):
+        queued = [
+            QueuedEmail(
+                from_email=message.from_email,
+                recipients='\n'.join(message.recipients()),
+                message=message.message().as_bytes(),
+            )
+            for message in email_messages if message.recipients()
+        ]
+        QueuedEmail.objects.bulk_create(queued)
+        return len(queued)
+
+
+class StoredMIME(email.message.Message):
+    def as_bytes(self, unixfrom=False, linesep='\n'):
+        # Email backends ask for the line separator they need, see
+        # django.core.mail.message.SafeMIMEText.as_bytes.
+        return super().as_bytes(unixfrom, policy=self.policy.clone(linesep=linesep))
+
+
+class StoredMessage(EmailMessage):
+    '''A queued message as it was rendered when it was queued.'''
+    def __init__(self, queued):
+        super().__init__(from_email=queued.from_email, to=queued.recipients.split('\n'))
+        self.data = bytes(queued.message)
+
+    def message(self):
+        return email.message_from_bytes(self.data, _class=StoredMIME)
+
+
+def claim(batch_size):
+    '''
+    Return up to `batch_size` messages that are due, pushing them back by
+    BOARDS_MAIL_QUEUE_LEASE seconds so other workers skip them while they
+    are being sent.
+    '''
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            QueuedEmail.objects.select_for_update(skip_locked=True)
+            .filter(next_attempt_at__lte=now).order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        lease = timedelta(seconds=getattr(settings, 'BOARDS_MAIL_QUEUE_LEASE', 600))
+        QueuedEmail.objects.filter(pk__in=[queued.pk for queued in batch]).update(next_attempt_at=now + lease)
+    return batch
+
+
+def send_queued(batch_size=100, connection=None):
+    '''
+    Send every message that is due, `batch_size` at a time, over one
+    connection. Return the numbers of messages sent and failed.
+    '''
+    if connection is None:
+        connection = get_connection(getattr(settings, 'BOARDS_MAIL_QUEUE_BACKEND', DEFAULT_BACKEND))
+    max_attempts = getattr(settings, 'BOARDS_MAIL_QUEUE_MAX_ATTEMPTS', 5)
+    sent = failed = 0
+    if not QueuedEmail.objects.filter(next_attempt_at__lte=timezone.now()).exists():
+        return sent, failed
+    # Connect before claiming anything, so an unreachable server costs the
+    # queued messages no attempts.
+    connection.open()
+    try:
+        batch = claim(batch_size)
+        while batch:
+            delivered = []
+            for queued in batch:
+                try:
+                    connection.open()
+                    connection.send_messages([StoredMessage(queued)])
+                except Exception as error:
+                    failed += 1
+                    queued.attempts += 1
+                    queued.last_error = repr(error)
+                    if permanent(error) or queued.attempts >= max_attempts:
+                        queued.next_attempt_at = None
+                    else:
+                        queued.next_attempt_at = timezone.now() + retry_delay(queued.attempts)
+                    queued.save(update_fields=['attempts', 'last_error', 'next_attempt_at'])
+                    if isinstance(error, smtplib.SMTPServerDisconnected) or not isinstance(error, smtplib.SMTPException):
+                        # The connection may be gone; reconnect for the next message.
+                        connection.close()
+                else:
+                    sent += 1
+                    delivered.append(queued.pk)
+            QueuedEmail.objects.filter(pk__in=delivered).delete()
+            batch = claim(batch_size)
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from boards.archive import archive_topics
+
+
+class Command(BaseCommand):
+    help = (
+        'Move topics without new posts for --days days, with their posts, into the archive tables, '
+        'one batch of topics per transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'BOARDS_ARCHIVE_AFTER_DAYS', 365),
+            help='Archive topics last updated more than this many days ago.',
+        )
+        parser.add_argument('--batch-size', type=int, default=100, help='Topics moved per transaction.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        topics, posts = archive_topics(cutoff, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS('Archived {0} topics and {1} posts.'.format(topics, posts)))
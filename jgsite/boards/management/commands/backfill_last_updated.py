@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from boards.cache import INDEX, board_scope, bump_versions
+from boards.models import Board, Post, Topic
+
+
+class Command(BaseCommand):
+    help = 'Move Topic.last_updated forward to the latest post or post edit of every topic.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000, help='Topics updated per transaction.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = Post.objects.filter(topic=OuterRef('pk'))
+        latest_post = posts.order_by('-created_at').values('created_at')[:1]
+        latest_edit = posts.filter(updated_at__isnull=False).order_by('-updated_at').values('updated_at')[:1]
+        last_updated = Greatest(
+            'last_updated',
+            Coalesce(Subquery(latest_post), 'last_updated'),
+            Coalesce(Subquery(latest_edit), 'last_updated'),
+        )
+        last_pk = Topic.objects.aggregate(last=Max('pk'))['last'] or 0
+        topics = 0
+        for start in range(0, last_pk, batch_size):
+            with transaction.atomic():
+                topics += Topic.objects.filter(pk__gt=start, pk__lte=start + batch_size).update(
+                    last_updated=last_updated
+                )
+        bump_versions(INDEX, *[board_scope(pk) for pk in Board.objects.values_list('pk', flat=True)])
+        self.stdout.write(self.style.SUCCESS('Backfilled last_updated of {0} topics.'.format(topics)))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from boards import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the throughput of the read views under WSGI and ASGI, sync and async, '
+        'with concurrent requests against the current database (see seed_boards).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per view and interface.')
+        parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight at once.')
+        parser.add_argument('--view', action='append', dest='views', help='Only run this view; repeatable.')
+        parser.add_argument('--output', '-o', default='benchmark-asgi.json', help='Where to write the results.')
+
+    def handle(self, *args, **options):
+        try:
+            results = benchmarks.throughput(
+                requests=options['requests'], concurrency=options['concurrency'], only=options['views'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        benchmarks.save(results, options['output'])
+
+        self.stdout.write('{0:<20} {1:>12} {2:>12} {3:>12}'.format('view', 'wsgi req/s', 'asgi sync', 'asgi async'))
+        for name, result in results['views'].items():
+            self.stdout.write('{0:<20} {1:>12.1f} {2:>12.1f} {3:>12.1f}'.format(
+                name, result['wsgi']['requests_per_second'], result['asgi_sync']['requests_per_second'],
+                result['asgi_async']['requests_per_second'],
+            ))
+            errors = sum(mode['errors'] for mode in result.values())
+            if errors:
+                self.stderr.write('{0}: {1} requests failed'.format(name, errors))
+        self.stdout.write('Results written to {0}.'.format(options['output']))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from boards import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the boards views against the current database (see seed_boards) and write '
+        'latency percentiles, queries per request and peak memory to a JSON file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='Timed requests per view.')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per view first.')
+        parser.add_argument('--view', action='append', dest='views', help='Only run this scenario; repeatable.')
+        parser.add_argument(
+            '--authenticated', action='store_true',
+            help='Request read views as a logged-in user, bypassing the anonymous page cache.',
+        )
+        parser.add_argument('--output', '-o', default='benchmark.json', help='Where to write the results.')
+        parser.add_argument('--compare', metavar='BASELINE', help='Fail on regressions against this results file.')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Allowed p95 slowdown against the baseline, as a fraction. Defaults to 0.2.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            results = benchmarks.run(
+                requests=options['requests'], warmup=options['warmup'],
+                authenticated=options['authenticated'], only=options['views'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        benchmarks.save(results, options['output'])
+
+        self.stdout.write('{0:<20} {1:>9} {2:>9} {3:>9} {4:>9} {5:>11}'.format(
+            'view', 'p50 ms', 'p95 ms', 'p99 ms', 'queries', 'peak KiB'
+        ))
+        for name, result in results['views'].items():
+            self.stdout.write('{0:<20} {1:>9.1f} {2:>9.1f} {3:>9.1f} {4:>9g} {5:>11.0f}'.format(
+                name, result['p50_ms'], result['p95_ms'], result['p99_ms'],
+                result['queries_per_request'], result['peak_memory_kb'],
+            ))
+        self.stdout.write('Results written to {0}.'.format(options['output']))
+
+        if options['compare']:
+            regressions = benchmarks.compare(results, benchmarks.load(options['compare']), options['tolerance'])
+            if regressions:
+                raise CommandError('Regressions against {0}:\n  {1}'.format(
+                    options['compare'], '\n  '.join(regressions)
+                ))
+            self.stdout.write(self.style.SUCCESS('No regressions against {0}.'.format(options['compare'])))
@@ -0,0 +1,131 @@
+import glob
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+TEMPLATES = ('templates/base.html', 'boards/templates/boards/*.html', 'boards/templates/boards/includes/*.html')
+STYLESHEETS = ('css/fonts.css', 'css/bootstrap.min.css', 'css/app.css')
+# Classes only ever added by template filters or bootstrap's JavaScript.
+EXTRA_CLASSES = ('form-control', 'is-valid', 'is-invalid', 'show', 'collapsing')
+# States that cannot apply before the user interacts with the page.
+INTERACTIVE = re.compile(
+    r':(hover|focus|focus-within|active|visited|checked|disabled|invalid|valid|indeterminate)\b'
+    r'|::?(-webkit-|-moz-|-ms-|selection|placeholder)'
+)
+
+COMMENT = re.compile(r'/\*.*?\*/', re.S)
+TEMPLATE_SYNTAX = re.compile(r'{[{%#].*?[}%#]}', re.S)
+PSEUDO = re.compile(r'::?[\w-]+(\([^)]*\))?')
+ATTRIBUTE = re.compile(r'\[[^\]]*\]')
+COMBINATOR = re.compile(r'\s*[\s>+~]\s*')
+
+
+def used_names(html):
+    '''Return the tag names, classes and ids that appear in template `html`.'''
+    tags = {tag.lower() for tag in re.findall(r'<([a-zA-Z][\w-]*)', html)} | {'html', 'body'}
+    classes, ids = set(), set()
+    for value in re.findall(r'\sclass="([^"]*)"', html):
+        classes.update(TEMPLATE_SYNTAX.sub(' ', value).split())
+    for value in re.findall(r'\sid="([^"]*)"', html):
+        ids.update(TEMPLATE_SYNTAX.sub(' ', value).split())
+    return tags, classes, ids
+
+
+def selector_used(selector, tags, classes, ids):
+    if INTERACTIVE.search(selector):
+        return False
+    selector = ATTRIBUTE.sub('', PSEUDO.sub('', selector))
+    for compound in COMBINATOR.split(selector.strip()):
+        tag = re.match(r'[a-zA-Z][\w-]*', compound)
+        if tag and tag.group().lower() not in tags:
+            return False
+        if not set(re.findall(r'\.([\w-]+)', compound)) <= classes:
+            return False
+        if not set(re.findall(r'#([\w-]+)', compound)) <= ids:
+            return False
+    return True
+
+
+def block_end(css, start):
+    '''Index just past the `}` matching the `{` at `start`.'''
+    depth = 0
+    for index in range(start, len(css)):
+        if css[index] == '{':
+            depth += 1
+        elif css[index] == '}':
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    raise ValueError('Unbalanced braces in stylesheet.')
+
+
+def critical_rules(css, tags, classes, ids):
+    '''
+    Keep the rules of `css` with at least one selector that can match the
+    given names, and the @media/@supports blocks that still hold rules.
+    @font-face blocks are kept as they are; print styles and other
+    at-rules are dropped.
+    '''
+    kept = []
+    index = 0
+    while True:
+        start = css.find('{', index)
+        if start == -1:
+            break
+        prelude = css[index:start].strip()
+        if ';' in prelude and prelude.startswith('@'):
+            # Skip statements such as @charset or @import before the block.
+            prelude = prelude.rsplit(';', 1)[1].strip()
+        end = block_end(css, start)
+        body = css[start + 1:end - 1]
+        if prelude.startswith(('@media', '@supports')) and not prelude.startswith('@media print'):
+            inner = critical_rules(body, tags, classes, ids)
+            if inner:
+                kept.append('{0}{{{1}}}'.format(prelude, inner))
+        elif prelude.startswith('@font-face'):
+            kept.append('@font-face{{{0}}}'.format(' '.join(body.split())))
+        elif not prelude.startswith('@'):
+            selectors = [selector.strip() for selector in prelude.split(',')]
+            selectors = [selector for selector in selectors if selector_used(selector, tags, classes, ids)]
+            if selectors:
+                kept.append('{0}{{{1}}}'.format(','.join(selectors), body.strip()))
+        index = end
+    return ''.join(kept)
+
+
+class Command(BaseCommand):
+    help = (
+        'Extract the CSS rules used by base.html and the boards templates from the site stylesheets '
+        'into static/css/critical.css, which base.html inlines while the full stylesheets load asynchronously.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Defaults to css/critical.css in the first STATICFILES_DIRS.')
+
+    def handle(self, *args, **options):
+        tags, classes, ids = set(), set(EXTRA_CLASSES), set()
+        for pattern in TEMPLATES:
+            for path in glob.glob(os.path.join(settings.BASE_DIR, pattern)):
+                with open(path, encoding='utf-8') as template:
+                    names = used_names(template.read())
+                tags |= names[0]
+                classes |= names[1]
+                ids |= names[2]
+        rules, total = [], 0
+        for name in STYLESHEETS:
+            path = finders.find(name)
+            if path is None:
+                raise CommandError('Stylesheet {0} not found.'.format(name))
+            with open(path, encoding='utf-8') as stylesheet:
+                css = COMMENT.sub('', stylesheet.read())
+            total += len(css)
+            rules.append(critical_rules(css, tags, classes, ids))
+        output = options['output'] or os.path.join(settings.STATICFILES_DIRS[0], 'css', 'critical.css')
+        with open(output, 'w', encoding='utf-8') as critical:
+            critical.write('\n'.join(rules) + '\n')
+        self.stdout.write(self.style.SUCCESS('Wrote {0}: {1} of {2} bytes.'.format(
+            output, sum(len(rule) for rule in rules), total
+        )))
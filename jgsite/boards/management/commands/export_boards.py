@@ -0,0 +1,74 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from boards.models import ArchivedPost, ArchivedTopic, Board, Post, Topic
+
+BOARD_FIELDS = {'id': 'id', 'name': 'name', 'description': 'description'}
+TOPIC_FIELDS = {
+    'id': 'id', 'subject': 'subject', 'last_updated': 'last_updated', 'views': 'views',
+    'board_id': 'board', 'starter__username': 'starter',
+}
+POST_FIELDS = {
+    'id': 'id', 'message': 'message', 'created_at': 'created_at', 'updated_at': 'updated_at',
+    'topic_id': 'topic', 'created_by__username': 'created_by', 'updated_by__username': 'updated_by',
+}
+
+
+def serialize(model, fields, row, archived=False):
+    record = {'model': model}
+    if archived:
+        record['archived'] = True
+    for column, name in fields.items():
+        value = row[column]
+        record[name] = value.isoformat() if hasattr(value, 'isoformat') else value
+    return json.dumps(record, sort_keys=True)
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream boards, topics and posts, archived ones included, as newline-delimited JSON, '
+        'one object per line, in the format read by import_boards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', help='File to write to. Defaults to stdout.')
+        parser.add_argument('--board', action='append', dest='boards', help='Only export this board; repeatable.')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched per database round trip.')
+
+    def handle(self, *args, **options):
+        boards = Board.objects.order_by('pk')
+        topics = Topic.objects.order_by('pk')
+        posts = Post.objects.order_by('pk')
+        archived_topics = ArchivedTopic.objects.order_by('pk')
+        archived_posts = ArchivedPost.objects.order_by('pk')
+        if options['boards']:
+            boards = boards.filter(name__in=options['boards'])
+            topics = topics.filter(board__name__in=options['boards'])
+            posts = posts.filter(topic__board__name__in=options['boards'])
+            archived_topics = archived_topics.filter(board__name__in=options['boards'])
+            archived_posts = archived_posts.filter(topic__board__name__in=options['boards'])
+        # Archived topics and posts are ordinary records marked archived.
+        tables = (
+            ('board', BOARD_FIELDS, boards, False),
+            ('topic', TOPIC_FIELDS, topics, False),
+            ('topic', TOPIC_FIELDS, archived_topics, True),
+            ('post', POST_FIELDS, posts, False),
+            ('post', POST_FIELDS, archived_posts, True),
+        )
+
+        output = open(options['output'], 'w') if options['output'] else self.stdout
+        counts = {'board': 0, 'topic': 0, 'post': 0}
+        try:
+            # Boards come before the topics and topics before the posts that
+            # refer to them, which lets import_boards work in one pass.
+            # values() + iterator() streams plain dicts in chunks instead of
+            # caching model instances, so memory stays flat for any size.
+            for model, fields, queryset, archived in tables:
+                for row in queryset.values(*fields).iterator(chunk_size=options['chunk_size']):
+                    output.write(serialize(model, fields, row, archived) + '\n')
+                    counts[model] += 1
+        finally:
+            if options['output']:
+                output.close()
+        self.stderr.write('Exported {board} boards, {topic} topics and {post} posts.'.format(**counts))
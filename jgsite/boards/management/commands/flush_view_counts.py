@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from boards.viewcounts import flush_views
+
+
+class Command(BaseCommand):
+    help = 'Write buffered topic views to the database.'
+
+    def handle(self, *args, **options):
+        views = flush_views()
+        self.stdout.write(self.style.SUCCESS('Flushed {0} topic views.'.format(views)))
@@ -0,0 +1,228 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_datetime
+
+from boards.archive import move_topics
+from boards.markup import render
+from boards.models import ArchivedPost, ArchivedTopic, Board, Post, Topic
+
+
+@contextmanager
+def preserve_timestamps(*fields):
+    '''
+    Let bulk_create keep the timestamps from the export instead of
+    overwriting them with `auto_now_add`.
+    '''
+    saved = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now_add in zip(fields, saved):
+            field.auto_now_add = auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Import boards, topics and posts from the newline-delimited JSON written by export_boards, '
+        'with batched bulk inserts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="File to read, or '-' for stdin.")
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows per bulk INSERT transaction.')
+        parser.add_argument(
+            '--create-users', action='store_true',
+            help='Create users missing from this site, with unusable passwords, instead of failing.',
+        )
+        parser.add_argument(
+            '--skip-rebuild', action='store_true',
+            help='Do not rebuild board stats and the search index afterwards.',
+        )
+
+    def handle(self, *args, **options):
+        self.chunk_size = options['chunk_size']
+        self.create_users = options['create_users']
+        self.user_ids = {}
+        self.board_ids = {}
+        self.topic_ids = {}
+        self.archived_topic_ids = []
+        self.topics = []
+        self.posts = []
+        self.counts = {'board': 0, 'topic': 0, 'post': 0}
+        # Primary keys are assigned here rather than by the database so that
+        # posts can refer to topics inserted by bulk_create, which does not
+        # return ids on every backend. Do not import while the site takes
+        # new topics and posts. Archived rows keep their ids, so new ids
+        # must not collide with theirs either.
+        self.next_topic_id = max(
+            Topic.objects.aggregate(last=Max('pk'))['last'] or 0,
+            ArchivedTopic.objects.aggregate(last=Max('pk'))['last'] or 0,
+        ) + 1
+        self.next_post_id = max(
+            Post.objects.aggregate(last=Max('pk'))['last'] or 0,
+            ArchivedPost.objects.aggregate(last=Max('pk'))['last'] or 0,
+        ) + 1
+
+        handlers = {'board': self.add_board, 'topic': self.add_topic, 'post': self.add_post}
+        source = sys.stdin if options['input'] == '-' else open(options['input'])
+        started = time.time()
+        try:
+            with preserve_timestamps(Post._meta.get_field('created_at')):
+                for line_number, line in enumerate(source, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                        handler = handlers[record.pop('model')]
+                    except (ValueError, KeyError):
+                        raise CommandError('Line {0}: not a board, topic or post record.'.format(line_number))
+                    handler(record)
+                self.flush_topics()
+                self.flush_posts()
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        self.reset_sequences()
+        archived = self.archive_topics()
+        elapsed = max(time.time() - started, 1e-6)
+
+        rows = sum(self.counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            'Imported {board} boards, {topic} topics and {post} posts'.format(**self.counts) +
+            ' ({0} topics archived) in {1:.1f}s ({2:.0f} rows/s).'.format(archived, elapsed, rows / elapsed)
+        ))
+        if not options['skip_rebuild']:
+            # bulk_create sends no signals, so bring everything that is
+            # normally maintained incrementally up to date in one go.
+            call_command('rebuild_board_stats', stdout=self.stdout)
+            call_command('reconcile_posts_count', stdout=self.stdout)
+            call_command('rebuild_search_index', stdout=self.stdout)
+
+    def add_board(self, record):
+        board, _ = Board.objects.get_or_create(
+            name=record['name'], defaults={'description': record['description']}
+        )
+        self.board_ids[record['id']] = board.pk
+        self.counts['board'] += 1
+
+    def add_topic(self, record):
+        if record['board'] not in self.board_ids:
+            raise CommandError('Topic {0} refers to unknown board {1}.'.format(record['id'], record['board']))
+        self.topic_ids[record['id']] = self.next_topic_id
+        record['new_id'] = self.next_topic_id
+        if record.get('archived'):
+            self.archived_topic_ids.append(self.next_topic_id)
+        self.next_topic_id += 1
+        self.topics.append(record)
+        if len(self.topics) >= self.chunk_size:
+            self.flush_topics()
+
+    def add_post(self, record):
+        if record['topic'] not in self.topic_ids:
+            raise CommandError('Post {0} refers to unknown topic {1}.'.format(record['id'], record['topic']))
+        self.flush_topics()
+        self.posts.append(record)
+        if len(self.posts) >= self.chunk_size:
+            self.flush_posts()
+
+    def flush_topics(self):
+        if not self.topics:
+            return
+        self.resolve_users(record['starter'] for record in self.topics)
+        topics = [
+            Topic(
+                id=record['new_id'],
+                subject=record['subject'],
+                last_updated=parse_datetime(record['last_updated']),
+                views=record['views'],
+                board_id=self.board_ids[record['board']],
+                starter_id=self.user_ids[record['starter']],
+            )
+            for record in self.topics
+        ]
+        with transaction.atomic():
+            Topic.objects.bulk_create(topics, batch_size=self.chunk_size)
+        self.counts['topic'] += len(topics)
+        self.topics = []
+
+    def flush_posts(self):
+        if not self.posts:
+            return
+        self.resolve_users(record['created_by'] for record in self.posts)
+        self.resolve_users(record['updated_by'] for record in self.posts if record['updated_by'])
+        posts = []
+        for record in self.posts:
+            updated_at = record['updated_at']
+            posts.append(Post(
+                id=self.next_post_id,
+                message=record['message'],
+                message_html=render(record['message']),
+                topic_id=self.topic_ids[record['topic']],
+                created_at=parse_datetime(record['created_at']),
+                created_by_id=self.user_ids[record['created_by']],
+                updated_at=parse_datetime(updated_at) if updated_at else None,
+                updated_by_id=self.user_ids[record['updated_by']] if record['updated_by'] else None,
+            ))
+            self.next_post_id += 1
+        with transaction.atomic():
+            Post.objects.bulk_create(posts, batch_size=self.chunk_size)
+        self.counts['post'] += len(posts)
+        self.posts = []
+
+    def resolve_users(self, usernames):
+        missing = set(usernames) - set(self.user_ids)
+        if not missing:
+            return
+        self.user_ids.update(User.objects.filter(username__in=missing).values_list('username', 'pk'))
+        missing -= set(self.user_ids)
+        if not missing:
+            return
+        if not self.create_users:
+            raise CommandError('Unknown users: {0}. Use --create-users to create them.'.format(
+                ', '.join(sorted(missing))
+            ))
+        users = []
+        for username in missing:
+            user = User(username=username)
+            user.set_unusable_password()
+            users.append(user)
+        User.objects.bulk_create(users)
+        self.user_ids.update(User.objects.filter(username__in=missing).values_list('username', 'pk'))
+
+    def archive_topics(self):
+        '''
+        Move the topics exported as archived, which were imported as live
+        topics so the id sequences account for them, back into the
+        archive with their posts.
+        '''
+        for start in range(0, len(self.archived_topic_ids), self.chunk_size):
+            topic_ids = self.archived_topic_ids[start:start + self.chunk_size]
+            move_topics(Topic.objects.filter(pk__in=topic_ids).order_by('pk'))
+            # bulk_create left the topics' posts_count at 0.
+            counts = (
+                ArchivedPost.objects.filter(topic=OuterRef('pk')).order_by().values('topic')
+                .annotate(total=Count('pk')).values('total')
+            )
+            ArchivedTopic.objects.filter(pk__in=topic_ids).update(
+                posts_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+            )
+        return len(self.archived_topic_ids)
+
+    def reset_sequences(self):
+        statements = connection.ops.sequence_reset_sql(no_style(), [Topic, Post])
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
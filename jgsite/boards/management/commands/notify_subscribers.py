@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from boards.notifications import fan_out, send_digests
+
+
+class Command(BaseCommand):
+    help = (
+        'Write the notifications for new posts to the subscribers of their topics. With --digests, '
+        'also email every user a digest of the notifications not emailed yet.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Jobs, or digest recipients, at a time.')
+        parser.add_argument('--digests', action='store_true', help='Send the email digests afterwards.')
+        parser.add_argument('--loop', action='store_true', help='Keep running, polling for new jobs.')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls with --loop.')
+
+    def handle(self, *args, **options):
+        if options['digests'] and options['loop']:
+            raise CommandError('Digests are sent once per run; schedule --digests apart from the --loop worker.')
+        while True:
+            jobs = notified = 0
+            while True:
+                done, written = fan_out(options['batch_size'])
+                if not done:
+                    break
+                jobs += done
+                notified += written
+            if jobs or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    'Fanned out {0} posts into {1} notifications.'.format(jobs, notified)
+                ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        if options['digests']:
+            digests = send_digests(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS('Sent {0} digests.'.format(digests)))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from boards.cache import INDEX, board_scope, bump_versions
+from boards.models import ArchivedPost, ArchivedTopic, Board, Post, Topic
+from boards.signals import latest_post_id
+
+
+def count_of(queryset, field):
+    counts = queryset.order_by().values(field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the stored post/topic counters and last post of every board and topic. '
+        'Board counts include archived topics and posts.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            topics = Topic.objects.update(
+                posts_count=count_of(Post.objects.filter(topic=OuterRef('pk')), 'topic'),
+                last_post=latest_post_id(topic=OuterRef('pk')),
+            )
+            boards = Board.objects.update(
+                posts_count=(
+                    count_of(Post.objects.filter(topic__board=OuterRef('pk')), 'topic__board') +
+                    count_of(ArchivedPost.objects.filter(topic__board=OuterRef('pk')), 'topic__board')
+                ),
+                topics_count=(
+                    count_of(Topic.objects.filter(board=OuterRef('pk')), 'board') +
+                    count_of(ArchivedTopic.objects.filter(board=OuterRef('pk')), 'board')
+                ),
+                last_post=latest_post_id(topic__board=OuterRef('pk')),
+            )
+        bump_versions(INDEX, *[board_scope(pk) for pk in Board.objects.values_list('pk', flat=True)])
+        self.stdout.write(self.style.SUCCESS(
+            'Rebuilt stats for {0} boards and {1} topics.'.format(boards, topics)
+        ))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from boards.models import Post
+from boards.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of topics and posts from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Posts indexed per transaction.')
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        batch_size = options['batch_size']
+        started = time.time()
+        backend.clear()
+        posts = Post.objects.select_related('topic').only('message', 'topic__subject').order_by('pk')
+        indexed = 0
+        batch = []
+        for post in posts.iterator(chunk_size=batch_size):
+            batch.append(post)
+            if len(batch) == batch_size:
+                indexed += self.index(backend, batch)
+                batch = []
+        if batch:
+            indexed += self.index(backend, batch)
+        self.stdout.write(self.style.SUCCESS('Indexed {0} posts with {1} in {2:.1f}s.'.format(
+            indexed, backend.__class__.__name__, time.time() - started
+        )))
+
+    def index(self, backend, posts):
+        with transaction.atomic():
+            backend.index_posts(posts)
+        return len(posts)
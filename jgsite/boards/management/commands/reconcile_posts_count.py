@@ -0,0 +1,48 @@
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Value, When
+
+from accounts.models import Profile
+from boards.models import ArchivedPost, Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every user's Profile.posts_count with one grouped count of the posts, and one of "
+        'the archived posts, creating missing profiles and fixing the ones that drifted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Profiles updated per statement.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        counts = Counter()
+        for model in (Post, ArchivedPost):
+            counts.update(dict(
+                model.objects.order_by().values('created_by').annotate(total=Count('pk'))
+                .values_list('created_by', 'total')
+            ))
+        with transaction.atomic():
+            missing = User.objects.filter(profile__isnull=True).values_list('pk', flat=True)
+            created = Profile.objects.bulk_create(
+                [Profile(user_id=pk, posts_count=counts.get(pk, 0)) for pk in missing], batch_size=batch_size
+            )
+            drifted = {
+                user_id: counts.get(user_id, 0)
+                for user_id, posts_count in Profile.objects.values_list('user_id', 'posts_count').iterator()
+                if posts_count != counts.get(user_id, 0)
+            }
+            user_ids = list(drifted)
+            for start in range(0, len(user_ids), batch_size):
+                batch = user_ids[start:start + batch_size]
+                Profile.objects.filter(user__in=batch).update(posts_count=Case(
+                    *[When(user=user_id, then=Value(drifted[user_id])) for user_id in batch],
+                    output_field=IntegerField(),
+                ))
+        self.stdout.write(self.style.SUCCESS(
+            'Created {0} profiles and fixed {1} post counts.'.format(len(created), len(drifted))
+        ))
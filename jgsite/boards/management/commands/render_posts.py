@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, TextField, Value, When
+
+from boards.cache import INDEX, board_scope, bump_versions
+from boards.markup import render
+from boards.models import Board, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-render the stored HTML of every post, after the Markdown renderer or sanitizer changed. '
+        'Bump boards.markup.MARKUP_VERSION with such changes so cached post cards are re-rendered too.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Posts read and updated per transaction.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = Post.objects.only('message', 'message_html').order_by('pk')
+        checked = changed = 0
+        batch = []
+        for post in posts.iterator(chunk_size=batch_size):
+            batch.append(post)
+            if len(batch) == batch_size:
+                changed += self.render(batch)
+                checked += len(batch)
+                batch = []
+        if batch:
+            changed += self.render(batch)
+            checked += len(batch)
+        if changed:
+            bump_versions(INDEX, *[board_scope(pk) for pk in Board.objects.values_list('pk', flat=True)])
+        self.stdout.write(self.style.SUCCESS('Re-rendered {0} of {1} posts.'.format(changed, checked)))
+
+    def render(self, posts):
+        '''
+        Store the new HTML of the posts in `posts` whose HTML changed, with
+        one UPDATE ... CASE for the whole batch.
+        '''
+        rendered = {}
+        for post in posts:
+            html = render(post.message)
+            if html != post.message_html:
+                rendered[post.pk] = html
+        if rendered:
+            with transaction.atomic():
+                Post.objects.filter(pk__in=rendered).update(message_html=Case(
+                    *[When(pk=pk, then=Value(html)) for pk, html in rendered.items()],
+                    output_field=TextField(),
+                ))
+        return len(rendered)
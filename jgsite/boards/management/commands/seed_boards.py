@@ -0,0 +1,37 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from boards import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with a synthetic forum for benchmarking, using batched bulk inserts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--boards', type=int, default=100)
+        parser.add_argument('--topics', type=int, default=1000000)
+        parser.add_argument('--posts', type=int, default=10000000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Rows per bulk INSERT transaction.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for reproducible datasets.')
+        parser.add_argument('--index', action='store_true', help='Also rebuild the search index.')
+
+    def handle(self, *args, **options):
+        if options['posts'] < options['topics']:
+            options['posts'] = options['topics']
+        started = time.time()
+        benchmarks.seed(
+            boards=options['boards'], topics=options['topics'], posts=options['posts'],
+            users=options['users'], chunk_size=options['chunk_size'], seed=options['seed'],
+            log=lambda message: self.stdout.write('  ' + message) if options['verbosity'] > 1 else None,
+        )
+        rows = options['boards'] + options['topics'] + options['posts']
+        elapsed = max(time.time() - started, 1e-6)
+        self.stdout.write('Inserted {0} rows in {1:.1f}s ({2:.0f} rows/s).'.format(rows, elapsed, rows / elapsed))
+        call_command('rebuild_board_stats', stdout=self.stdout)
+        call_command('reconcile_posts_count', stdout=self.stdout)
+        call_command('backfill_last_updated', stdout=self.stdout)
+        if options['index']:
+            call_command('rebuild_search_index', stdout=self.stdout)
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from boards.mail import send_queued
+
+
+class Command(BaseCommand):
+    help = (
+        'Send the messages waiting in the outbound mail queue, in batches over one connection. '
+        'With --loop, keep polling the queue.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Messages claimed from the queue at a time.')
+        parser.add_argument('--loop', action='store_true', help='Keep running, polling the queue.')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls with --loop.')
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = send_queued(options['batch_size'])
+            except OSError as error:
+                # The mail server is unreachable; the queue is left as it was.
+                if not options['loop']:
+                    raise
+                self.stderr.write('Could not connect: {0!r}'.format(error))
+                sent = failed = 0
+            if sent or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS('Sent {0} messages, {1} failed.'.format(sent, failed)))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,121 @@
+import glob
+import io
+import os
+import re
+import string
+import urllib.parse
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+try:
+    from fontTools import subset
+except ImportError:
+    subset = None
+
+# (family, weight) of every web font the stylesheets name.
+FONTS = (
+    ('Roboto', 400),
+    ('Average', 400),
+    ('Peralta', 400),
+)
+# The templates only use ASCII; keep common typography for user content.
+GLYPHS = string.ascii_letters + string.digits + string.punctuation + '  –—‘’“”…•©'
+GOOGLE_FONTS_CSS = 'https://fonts.googleapis.com/css2?family={family}:wght@{weight}&text={text}&display=swap'
+FORMATS = {'woff2': 'woff2', 'woff': 'woff', 'ttf': 'truetype'}
+# Google Fonts only serves WOFF2 to browsers it knows support it.
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+
+FONT_FACE = '''@font-face {{
+  font-family: '{family}';
+  font-style: normal;
+  font-weight: {weight};
+  font-display: swap;
+  src: url('../fonts/{filename}') format('{format}');
+}}
+'''
+
+
+def slug(family, weight):
+    return '{0}-{1}'.format(family.lower(), weight)
+
+
+class Command(BaseCommand):
+    help = (
+        'Vendor the Roboto, Average and Peralta web fonts into static/fonts, subset to the glyphs the '
+        'site uses, and write static/css/fonts.css. Fonts come from --source, a directory of '
+        'Family-Regular.ttf/.otf/.woff files subset with fontTools, or from Google Fonts with --download.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', help='Directory with the original font files.')
+        parser.add_argument('--download', action='store_true', help='Fetch subset fonts from Google Fonts.')
+        parser.add_argument('--family', action='append', dest='families', help='Only this family; repeatable.')
+        parser.add_argument('--text', default='', help='Extra characters to keep.')
+        parser.add_argument(
+            '--static-dir', default=None,
+            help='Static directory to write fonts/ and css/fonts.css into. Defaults to the first STATICFILES_DIRS.',
+        )
+
+    def handle(self, *args, **options):
+        if bool(options['source']) == options['download']:
+            raise CommandError('Give exactly one of --source and --download.')
+        if options['source'] and subset is None:
+            raise CommandError('Subsetting local fonts needs fontTools: pip install fonttools brotli')
+        static_dir = options['static_dir'] or settings.STATICFILES_DIRS[0]
+        os.makedirs(os.path.join(static_dir, 'fonts'), exist_ok=True)
+        text = ''.join(sorted(set(GLYPHS + options['text'])))
+        faces = []
+        for family, weight in FONTS:
+            if options['families'] and family not in options['families']:
+                continue
+            if options['download']:
+                data, extension = self.download(family, weight, text)
+            else:
+                data, extension = self.subset(options['source'], family, text)
+            if data is None:
+                self.stderr.write('No source font for {0}, skipped.'.format(family))
+                continue
+            filename = '{0}.{1}'.format(slug(family, weight), extension)
+            with open(os.path.join(static_dir, 'fonts', filename), 'wb') as output:
+                output.write(data)
+            faces.append(FONT_FACE.format(family=family, weight=weight, filename=filename, format=FORMATS[extension]))
+            self.stdout.write('{0}: {1} ({2} bytes)'.format(family, filename, len(data)))
+        with open(os.path.join(static_dir, 'css', 'fonts.css'), 'w') as output:
+            output.write('\n'.join(faces))
+        self.stdout.write(self.style.SUCCESS('Wrote {0} font faces.'.format(len(faces))))
+
+    def subset(self, source, family, text):
+        candidates = [
+            path for path in sorted(glob.glob(os.path.join(source, '{0}*'.format(family))))
+            if path.lower().endswith(('.ttf', '.otf', '.woff', '.woff2')) and 'regular' in path.lower()
+        ]
+        if not candidates:
+            return None, None
+        font = subset.load_font(candidates[0], subset.Options())
+        options = subset.Options()
+        try:
+            import brotli  # noqa: F401
+            options.flavor = 'woff2'
+        except ImportError:
+            options.flavor = 'woff'
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(text=text)
+        subsetter.subset(font)
+        output = io.BytesIO()
+        subset.save_font(font, output, options)
+        return output.getvalue(), options.flavor
+
+    def download(self, family, weight, text):
+        url = GOOGLE_FONTS_CSS.format(
+            family=urllib.parse.quote(family), weight=weight, text=urllib.parse.quote(text)
+        )
+        request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+        with urllib.request.urlopen(request) as response:
+            css = response.read().decode()
+        match = re.search(r"url\((https://[^)]+)\) format\('(woff2?|truetype)'\)", css)
+        if match is None:
+            return None, None
+        with urllib.request.urlopen(match.group(1)) as response:
+            return response.read(), {'truetype': 'ttf'}.get(match.group(2), match.group(2))
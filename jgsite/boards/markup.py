@@ -0,0 +1,89 @@
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from django.utils.html import escape, linebreaks
+
+try:
+    import markdown
+except ImportError:
+    markdown = None
+
+# Post bodies are written in Markdown and rendered to HTML once, when the
+# post is saved (see Post.save), into Post.message_html, so views output
+# stored HTML instead of converting on every request. Raw HTML in the
+# source is not passed through, and the converted HTML is run through a
+# whitelist sanitizer, so the stored HTML is safe to output unescaped.
+# Without the markdown package, paragraphs and line breaks are kept and
+# everything else is escaped. `manage.py render_posts` re-renders every
+# post after the renderer changes.
+
+# Part of the cache key of rendered post cards. Bump it with any change to
+# the rendering or sanitizing below, then run render_posts.
+MARKUP_VERSION = 1
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'sane_lists']
+ALLOWED_TAGS = {
+    'a', 'blockquote', 'br', 'code', 'em', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'img',
+    'li', 'ol', 'p', 'pre', 'strong', 'ul',
+}
+ALLOWED_ATTRIBUTES = {'a': {'href', 'title'}, 'img': {'src', 'alt', 'title'}}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_SCHEMES = {'', 'http', 'https', 'mailto'}
+VOID_TAGS = {'br', 'hr', 'img'}
+# Browsers ignore these anywhere in a URL, so `java\tscript:` is javascript:
+IGNORED_IN_URLS = re.compile(r'[\x00-\x20]+')
+
+
+def safe_url(url):
+    return urlsplit(IGNORED_IN_URLS.sub('', url)).scheme.lower() in ALLOWED_SCHEMES
+
+
+class Sanitizer(HTMLParser):
+    '''
+    Rebuild HTML keeping only whitelisted tags and attributes, and only
+    http(s), mailto and relative URLs. Links get rel="nofollow".
+    '''
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.output = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES.get(tag, ())
+        parts = [tag]
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not safe_url(value):
+                continue
+            parts.append('{0}="{1}"'.format(name, escape(value)))
+        if tag == 'a':
+            parts.append('rel="nofollow"')
+        self.output.append('<{0}>'.format(' '.join(parts)))
+
+    def handle_endtag(self, tag):
+        if tag in ALLOWED_TAGS and tag not in VOID_TAGS:
+            self.output.append('</{0}>'.format(tag))
+
+    def handle_data(self, data):
+        self.output.append(escape(data))
+
+
+def sanitize(html):
+    sanitizer = Sanitizer()
+    sanitizer.feed(html)
+    sanitizer.close()
+    return ''.join(sanitizer.output)
+
+
+def render(text):
+    '''Return the sanitized HTML for Markdown `text`.'''
+    if markdown is None:
+        return linebreaks(text, autoescape=True)
+    converter = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS, output_format='html5')
+    # Treat raw HTML in the source as text rather than passing it through.
+    converter.preprocessors.deregister('html_block')
+    converter.inlinePatterns.deregister('html')
+    return sanitize(converter.convert(text))
@@ -0,0 +1,39 @@
+# Generated by Django 2.1.15 on 2026-10-18 07:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='last_post',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='boards.Post'),
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='topics_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='last_post',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='boards.Post'),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
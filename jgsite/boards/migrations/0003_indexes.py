@@ -0,0 +1,38 @@
+# Generated by Django 2.1.15 on 2026-10-18 07:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0002_board_stats'),
+    ]
+
+    operations = [
+        # Create the composite indexes before dropping the single-column FK
+        # indexes they make redundant; MySQL needs an index on every FK.
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['topic', 'created_at', 'id'], name='boards_post_topic_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['created_at', 'id'], name='boards_post_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['board', 'last_updated', 'id'], name='boards_topic_board_updated_idx'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='topic',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='posts', to='boards.Topic'),
+        ),
+        migrations.AlterField(
+            model_name='topic',
+            name='board',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='topics', to='boards.Board'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 2.1.15 on 2026-10-18 07:06
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+import django.db.models.deletion
+
+
+def create_fts_table(apps, schema_editor):
+    # FTS5 is optional: it only exists on SQLite builds compiled with it.
+    # Without it boards.search falls back to the PostTerm inverted index.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE boards_post_fts USING fts5(subject, message, tokenize = 'unicode61')"
+        )
+    except OperationalError:
+        pass
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS boards_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0003_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='boards.Post')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='postterm',
+            unique_together={('term', 'post')},
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
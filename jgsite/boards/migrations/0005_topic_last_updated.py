@@ -0,0 +1,19 @@
+# Generated by Django 2.1.15 on 2026-10-18 07:15
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0004_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='topic',
+            name='last_updated',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
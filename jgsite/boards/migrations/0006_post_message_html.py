@@ -0,0 +1,18 @@
+# Generated by Django 2.1.15 on 2026-10-18 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0005_topic_last_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='message_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+    ]
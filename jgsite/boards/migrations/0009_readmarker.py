@@ -0,0 +1,29 @@
+# Generated by Django 2.1.15 on 2026-10-18 07:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('boards', '0008_subscriptions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReadMarker',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_post_id', models.PositiveIntegerField()),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='boards.Topic')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='readmarker',
+            unique_together={('user', 'topic')},
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 2.1.15 on 2026-10-18 07:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('boards', '0009_readmarker'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPost',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('message', models.TextField(max_length=4000)),
+                ('message_html', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(null=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedTopic',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('subject', models.CharField(max_length=255)),
+                ('last_updated', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('board', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_topics', to='boards.Board')),
+                ('starter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='archivedpost',
+            name='topic',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='posts', to='boards.ArchivedTopic'),
+        ),
+        migrations.AddField(
+            model_name='archivedpost',
+            name='updated_by',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtopic',
+            index=models.Index(fields=['board', 'last_updated', 'id'], name='boards_arch_topic_board_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedpost',
+            index=models.Index(fields=['topic', 'created_at', 'id'], name='boards_arch_post_topic_idx'),
+        ),
+    ]
@@ -1,40 +1,267 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.utils.text import Truncator
 
+from .markup import render
+
+
+class BoardQuerySet(models.QuerySet):
+    def with_stats(self):
+        '''
+        Load every board together with its latest post and that post's
+        author in one query. Post and topic counts are stored columns on
+        the board itself, see `boards.signals`.
+        '''
+        return self.select_related('last_post__created_by').defer('last_post__message')
+
 
 class Board(models.Model):
     name = models.CharField(max_length=30, unique=True)
     description = models.CharField(max_length=100)
+    posts_count = models.PositiveIntegerField(default=0)
+    topics_count = models.PositiveIntegerField(default=0)
+    last_post = models.ForeignKey('Post', on_delete=models.SET_NULL, null=True, related_name='+')
+
+    objects = BoardQuerySet.as_manager()
 
     def __str__(self):
         return self.name
     
     def get_posts_count(self):
-        return Post.objects.filter(topic__board=self).count()
+        return self.posts_count
 
     def get_last_post(self):
-        return Post.objects.filter(topic__board=self).order_by('-created_at').first()    
+        return self.last_post
+
+class TopicQuerySet(models.QuerySet):
+    def with_unread(self, user):
+        '''
+        Annotate `unread`: whether the topic has a post newer than the last
+        one `user` read, per their ReadMarker. Topics they never opened
+        count as unread. A correlated subquery, so a page of topics still
+        takes one query.
+        '''
+        if not user.is_authenticated:
+            return self
+        return self.annotate(
+            last_read_post_id=models.Subquery(
+                ReadMarker.objects.filter(topic=models.OuterRef('pk'), user=user).values('last_read_post_id')[:1]
+            ),
+        ).annotate(unread=models.Case(
+            models.When(last_post__isnull=True, then=models.Value(False)),
+            models.When(last_read_post_id__isnull=True, then=models.Value(True)),
+            models.When(last_post__gt=models.F('last_read_post_id'), then=models.Value(True)),
+            default=models.Value(False),
+            output_field=models.BooleanField(),
+        ))
+
 
 class Topic(models.Model):
     subject = models.CharField(max_length=255)
-    last_updated = models.DateTimeField(auto_now_add=True)
-    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='topics')
+    # Time of the latest post or post edit, kept current by boards.signals.
+    last_updated = models.DateTimeField(default=timezone.now)
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='topics', db_index=False)
     starter = models.ForeignKey(User, on_delete=models.CASCADE, related_name='topics')
     views = models.PositiveIntegerField(default=0)
+    posts_count = models.PositiveIntegerField(default=0)
+    last_post = models.ForeignKey('Post', on_delete=models.SET_NULL, null=True, related_name='+')
+
+    objects = TopicQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # board_topics: WHERE board_id = %s ORDER BY last_updated, id
+            models.Index(fields=['board', 'last_updated', 'id'], name='boards_topic_board_updated_idx'),
+        ]
 
     def __str__(self):
         return self.subject
 
+    def get_replies_count(self):
+        return max(self.posts_count - 1, 0)
+
 
 class Post(models.Model):
     message = models.TextField(max_length=4000)
-    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name='posts')
+    # `message` rendered from Markdown and sanitized on save, see boards.markup.
+    message_html = models.TextField(blank=True, default='', editable=False)
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name='posts', db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(null=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
     updated_by = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='+')
+
+    class Meta:
+        indexes = [
+            # topic_posts and a topic's last post: WHERE topic_id = %s ORDER BY created_at, id
+            models.Index(fields=['topic', 'created_at', 'id'], name='boards_post_topic_created_idx'),
+            # a board's last post: posts joined to the board's topics, newest first
+            models.Index(fields=['created_at', 'id'], name='boards_post_created_idx'),
+        ]
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'message' in update_fields:
+            self.message_html = render(self.message)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'message_html'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         truncated_message = Truncator(self.message)
-        return truncated_message.chars(30)    
\ No newline at end of file
+        return truncated_message.chars(30)    
+
+class ArchivedTopic(models.Model):
+    '''
+    A topic moved out of Topic by `manage.py archive_topics` after a long
+    time without posts, keeping its id so its URLs keep working. Archived
+    topics and posts are read-only; see `boards.archive`.
+    '''
+    id = models.IntegerField(primary_key=True)
+    subject = models.CharField(max_length=255)
+    last_updated = models.DateTimeField()
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='archived_topics', db_index=False)
+    starter = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    views = models.PositiveIntegerField(default=0)
+    posts_count = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # archived_topics: WHERE board_id = %s ORDER BY last_updated, id
+            models.Index(fields=['board', 'last_updated', 'id'], name='boards_arch_topic_board_idx'),
+        ]
+
+    def __str__(self):
+        return self.subject
+
+    def get_replies_count(self):
+        return max(self.posts_count - 1, 0)
+
+
+class ArchivedPost(models.Model):
+    '''A post of an ArchivedTopic, with the id it had as a Post.'''
+    id = models.IntegerField(primary_key=True)
+    message = models.TextField(max_length=4000)
+    message_html = models.TextField(blank=True, default='')
+    topic = models.ForeignKey(ArchivedTopic, on_delete=models.CASCADE, related_name='posts', db_index=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField(null=True)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    updated_by = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='+')
+
+    class Meta:
+        indexes = [
+            # topic_posts of an archived topic: WHERE topic_id = %s ORDER BY created_at, id
+            models.Index(fields=['topic', 'created_at', 'id'], name='boards_arch_post_topic_idx'),
+        ]
+
+    def __str__(self):
+        return Truncator(self.message).chars(30)
+
+
+class PostTerm(models.Model):
+    '''
+    One row of the portable inverted index used by
+    `boards.search.InvertedIndexBackend`: how often `term` occurs in a
+    post, with words of the topic subject counting extra.
+    '''
+    term = models.CharField(max_length=64)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ('term', 'post')
+
+    def __str__(self):
+        return self.term
+
+
+class Subscription(models.Model):
+    '''
+    A user following a topic. Starting a topic or replying to it
+    subscribes the author, see `boards.signals`.
+    '''
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('topic', 'user')
+
+    def __str__(self):
+        return '{0} follows {1}'.format(self.user_id, self.topic_id)
+
+
+class NotificationJob(models.Model):
+    '''
+    A new post whose topic's subscribers have not been notified yet.
+    `manage.py notify_subscribers` fans it out into Notification rows and
+    deletes it.
+    '''
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name='+')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    # When the post was written; later subscribers are not notified of it.
+    created_at = models.DateTimeField()
+
+
+class Notification(models.Model):
+    '''A new post in a topic `user` follows, see `boards.notifications`.'''
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', db_index=False)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(default=timezone.now)
+    # When the notification went out in an email digest.
+    emailed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            # a user's notifications, newest first
+            models.Index(fields=['user', 'created_at'], name='boards_notif_user_idx'),
+            # digests: WHERE emailed_at IS NULL ORDER BY user_id
+            models.Index(fields=['emailed_at', 'user'], name='boards_notif_pending_idx'),
+        ]
+
+    def __str__(self):
+        return '{0}: post {1}'.format(self.user_id, self.post_id)
+
+
+class ReadMarker(models.Model):
+    '''
+    The newest post `user` has seen in `topic`: one row per user and
+    topic rather than one per post read, see `boards.readmarkers`.
+    '''
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', db_index=False)
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name='+')
+    last_read_post_id = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ('user', 'topic')
+
+    def __str__(self):
+        return '{0} read {1} up to {2}'.format(self.user_id, self.topic_id, self.last_read_post_id)
+
+
+class QueuedEmail(models.Model):
+    '''
+    An outbound message waiting in the mail queue, see `boards.mail`.
+    Sent messages are deleted; messages given up on keep their last error
+    and have no `next_attempt_at`.
+    '''
+    from_email = models.CharField(max_length=254)
+    recipients = models.TextField()
+    message = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, null=True)
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta:
+        indexes = [
+            # the worker: WHERE next_attempt_at <= now ORDER BY next_attempt_at, id
+            models.Index(fields=['next_attempt_at', 'id'], name='boards_queuedemail_due_idx'),
+        ]
+
+    def __str__(self):
+        return '{0} to {1}'.format(self.from_email, ', '.join(self.recipients.split('\n')))
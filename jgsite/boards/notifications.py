@@ -0,0 +1,90 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Max
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Notification, NotificationJob, Subscription
+
+# Reply notifications. Saving a post only inserts one NotificationJob row,
+# see `boards.signals`, whatever the number of subscribers.
+# `manage.py notify_subscribers` later fans the jobs out: one query finds
+# the subscribers of a whole batch of jobs and the notifications are
+# written with bulk_create. With --digests it then mails every user one
+# digest of the notifications not emailed yet, through the configured
+# EMAIL_BACKEND (use boards.mail.QueueBackend to queue them).
+
+
+def subscribe(user_id, topic_id):
+    Subscription.objects.get_or_create(user_id=user_id, topic_id=topic_id)
+
+
+def fan_out(batch_size=100):
+    '''
+    Turn up to `batch_size` jobs into notifications for every user but
+    the author who followed the topic when the post was written. Return
+    the numbers of jobs done and notifications written.
+    '''
+    with transaction.atomic():
+        jobs = list(
+            NotificationJob.objects.select_for_update(skip_locked=True).order_by('pk')[:batch_size]
+        )
+        if not jobs:
+            return 0, 0
+        subscribers = defaultdict(list)
+        for topic_id, user_id, since in Subscription.objects.filter(
+            topic__in={job.topic_id for job in jobs}
+        ).values_list('topic_id', 'user_id', 'created_at').iterator():
+            subscribers[topic_id].append((user_id, since))
+        notifications = [
+            Notification(user_id=user_id, post_id=job.post_id)
+            for job in jobs for user_id, since in subscribers[job.topic_id]
+            if user_id != job.author_id and since <= job.created_at
+        ]
+        Notification.objects.bulk_create(notifications, batch_size=1000)
+        NotificationJob.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+    return len(jobs), len(notifications)
+
+
+def send_digests(batch_size=100):
+    '''
+    Email every user with notifications not emailed yet one digest of
+    them, `batch_size` users at a time over one connection. Return the
+    number of digests sent.
+    '''
+    pending = Notification.objects.filter(emailed_at__isnull=True)
+    # Notifications written while the digests go out wait for the next run.
+    last = pending.aggregate(last=Max('pk'))['last']
+    if last is None:
+        return 0
+    pending = pending.filter(pk__lte=last)
+    user_ids = list(pending.order_by('user').values_list('user', flat=True).distinct())
+    site_url = getattr(settings, 'BOARDS_SITE_URL', '')
+    sent = 0
+    with get_connection() as connection:
+        for start in range(0, len(user_ids), batch_size):
+            batch = pending.filter(user__in=user_ids[start:start + batch_size])
+            topics = defaultdict(dict)
+            notifications = batch.select_related('user', 'post__topic').defer('post__message', 'post__message_html')
+            for notification in notifications.order_by('pk'):
+                topic = notification.post.topic
+                entry = topics[notification.user].setdefault(topic.pk, {'topic': topic, 'posts': 0})
+                entry['posts'] += 1
+            messages = []
+            for user, entries in topics.items():
+                if not user.email:
+                    continue
+                context = {'user': user, 'topics': list(entries.values()), 'site_url': site_url}
+                subject = render_to_string('boards/notification_digest_subject.txt', context)
+                messages.append(EmailMessage(
+                    ''.join(subject.splitlines()),
+                    render_to_string('boards/notification_digest_email.txt', context),
+                    to=[user.email],
+                ))
+            connection.send_messages(messages)
+            batch.update(emailed_at=timezone.now())
+            sent += len(messages)
+    return sent
@@ -0,0 +1,132 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+# Keyset ("cursor") pagination. Instead of OFFSET, each page is fetched by
+# comparing against the (value, pk) key of the last row already shown, so
+# the database seeks straight to the page through an index and page 1000
+# costs the same as page 1. Cursors are `n<key>` for the page after a row
+# and `p<key>` for the page before it.
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class CursorConverter:
+    regex = '[np][A-Za-z0-9_-]+'
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        return value
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(direction, value, pk):
+    key = '{0}|{1}'.format(value.isoformat(), pk).encode()
+    return direction + base64.urlsafe_b64encode(key).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    direction, token = cursor[:1], cursor[1:]
+    try:
+        key = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        value, pk = key.rsplit('|', 1)
+        value, pk = parse_datetime(value), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+    # Larger keys cannot be database integers.
+    if direction not in (NEXT, PREVIOUS) or value is None or not 0 <= pk < 2 ** 63:
+        raise InvalidCursor(cursor)
+    return direction, value, pk
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous, field):
+        self.object_list = object_list
+        self.has_next = has_next and bool(object_list)
+        self.has_previous = has_previous and bool(object_list)
+        self.field = field
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def next_cursor(self):
+        if self.has_next:
+            last = self.object_list[-1]
+            return encode_cursor(NEXT, getattr(last, self.field), last.pk)
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous:
+            first = self.object_list[0]
+            return encode_cursor(PREVIOUS, getattr(first, self.field), first.pk)
+
+
+class KeysetPaginator:
+    '''
+    Paginate `queryset` ordered by `(field, pk)`, newest first when
+    `descending` is set. `page()` takes a cursor from a previous page, or
+    None for the first page, and raises InvalidCursor for garbage input
+    and for cursors past either end of the list, such as stale links to
+    rows that were since deleted.
+    '''
+    def __init__(self, queryset, field, per_page, descending=False):
+        self.queryset = queryset
+        self.field = field
+        self.per_page = per_page
+        self.descending = descending
+
+    def ordering(self, descending):
+        prefix = '-' if descending else ''
+        return (prefix + self.field, prefix + 'pk')
+
+    def get_queryset(self, cursor=None):
+        '''
+        Return the direction of `cursor` and the query fetching its page,
+        plus one extra row to tell whether there is more beyond it.
+        '''
+        if cursor is None:
+            direction, queryset = NEXT, self.queryset
+        else:
+            direction, value, pk = decode_cursor(cursor)
+            # Walking forwards through a descending list, or backwards
+            # through an ascending one, means fetching smaller keys.
+            lookup = 'lt' if (direction == NEXT) == self.descending else 'gt'
+            queryset = self.queryset.filter(
+                Q(**{'{0}__{1}'.format(self.field, lookup): value}) |
+                Q(**{self.field: value, 'pk__{0}'.format(lookup): pk})
+            )
+        descending = self.descending if direction == NEXT else not self.descending
+        return direction, queryset.order_by(*self.ordering(descending))[:self.per_page + 1]
+
+    def page(self, cursor=None):
+        direction, queryset = self.get_queryset(cursor)
+        return self.make_page(direction, list(queryset), cursor)
+
+    def make_page(self, direction, rows, cursor=None):
+        '''
+        Build the page from the rows fetched with `get_queryset(cursor)`,
+        for callers that run the query themselves.
+        '''
+        if cursor is not None and not rows:
+            raise InvalidCursor(cursor)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == NEXT:
+            return KeysetPage(rows, has_more, cursor is not None, self.field)
+        rows.reverse()
+        return KeysetPage(rows, True, has_more, self.field)
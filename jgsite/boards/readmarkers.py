@@ -0,0 +1,27 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Value
+from django.db.models.functions import Greatest
+
+from .models import ReadMarker
+
+# Unread tracking. Viewing topic posts moves the user's ReadMarker for
+# the topic forward to the newest post shown; board_topics compares it
+# with Topic.last_post, see TopicQuerySet.with_unread.
+
+
+def mark_read(user, topic_id, post_id):
+    '''
+    Upsert the marker, never moving it backwards: a single UPDATE once the
+    row exists, an INSERT the first time the user opens the topic.
+    '''
+    if not user.is_authenticated:
+        return
+    markers = ReadMarker.objects.filter(user=user, topic_id=topic_id)
+    if markers.update(last_read_post_id=Greatest('last_read_post_id', Value(post_id))):
+        return
+    try:
+        with transaction.atomic():
+            ReadMarker.objects.create(user=user, topic_id=topic_id, last_read_post_id=post_id)
+    except IntegrityError:
+        # Created by a concurrent request in the meantime.
+        markers.update(last_read_post_id=Greatest('last_read_post_id', Value(post_id)))
@@ -0,0 +1,175 @@
+import math
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, FloatField, Min, Sum, Value, When
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Board, Post, PostTerm
+
+# Full-text search over topic subjects and post messages. Each post is one
+# document; the opening post of a topic also carries the topic subject, so
+# subject matches find the topic without indexing it separately.
+#
+# Two interchangeable backends keep the index: SQLite's FTS5 extension, and
+# a portable inverted index stored in the PostTerm table for every other
+# database. BOARDS_SEARCH_BACKEND picks one by dotted path; by default FTS5
+# is used whenever the database supports it. `boards.signals` updates the
+# index as posts are written, `manage.py rebuild_search_index` rebuilds it.
+
+SUBJECT_WEIGHT = 3
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    return [word[:64] for word in WORD_RE.findall(text.lower())]
+
+
+def first_post_ids(posts):
+    topic_ids = {post.topic_id for post in posts}
+    return set(
+        Post.objects.filter(topic__in=topic_ids).order_by().values('topic')
+        .annotate(first=Min('pk')).values_list('first', flat=True)
+    )
+
+
+def documents(posts):
+    '''
+    Yield `(post_id, subject, message)` for `posts`, which must have their
+    topic loaded. The subject is empty except for opening posts.
+    '''
+    first_ids = first_post_ids(posts)
+    for post in posts:
+        subject = post.topic.subject if post.pk in first_ids else ''
+        yield post.pk, subject, post.message
+
+
+class FTS5Backend:
+    table = 'boards_post_fts'
+
+    @classmethod
+    def is_available(cls):
+        if connection.vendor != 'sqlite':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = %s", [cls.table])
+            return cursor.fetchone()[0] == 1
+
+    def index_posts(self, posts):
+        rows = list(documents(posts))
+        with connection.cursor() as cursor:
+            cursor.executemany('DELETE FROM {0} WHERE rowid = %s'.format(self.table), [row[:1] for row in rows])
+            cursor.executemany(
+                'INSERT INTO {0} (rowid, subject, message) VALUES (%s, %s, %s)'.format(self.table), rows
+            )
+
+    def remove_posts(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany('DELETE FROM {0} WHERE rowid = %s'.format(self.table), [[pk] for pk in post_ids])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM {0}'.format(self.table))
+
+    def search(self, query, offset, limit):
+        # Quote every word so user input can never be parsed as FTS5
+        # query syntax; the quoted words are implicitly AND-ed.
+        match = ' '.join('"{0}"'.format(word) for word in tokenize(query))
+        if not match:
+            return [], 0
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM {0} WHERE {0} MATCH %s'.format(self.table), [match])
+            total = cursor.fetchone()[0]
+            cursor.execute(
+                'SELECT rowid FROM {0} WHERE {0} MATCH %s '
+                'ORDER BY bm25({0}, %s, 1.0), rowid DESC LIMIT %s OFFSET %s'.format(self.table),
+                [match, float(SUBJECT_WEIGHT), limit, offset]
+            )
+            return [row[0] for row in cursor.fetchall()], total
+
+
+class InvertedIndexBackend:
+    def index_posts(self, posts):
+        terms = []
+        for post_id, subject, message in documents(posts):
+            weights = Counter(tokenize(message))
+            for word in tokenize(subject):
+                weights[word] += SUBJECT_WEIGHT
+            terms.extend(PostTerm(term=term, post_id=post_id, weight=weight) for term, weight in weights.items())
+        with transaction.atomic():
+            PostTerm.objects.filter(post__in=[post.pk for post in posts]).delete()
+            PostTerm.objects.bulk_create(terms, batch_size=1000)
+
+    def remove_posts(self, post_ids):
+        PostTerm.objects.filter(post__in=post_ids).delete()
+
+    def clear(self):
+        PostTerm.objects.all().delete()
+
+    def search(self, query, offset, limit):
+        words = sorted(set(tokenize(query)))
+        if not words:
+            return [], 0
+        # Rank with tf-idf: rare words weigh more than common ones.
+        documents_count = Board.objects.aggregate(total=Sum('posts_count'))['total'] or 1
+        frequencies = dict(
+            PostTerm.objects.filter(term__in=words).values('term')
+            .annotate(documents=Count('post')).values_list('term', 'documents')
+        )
+        if len(frequencies) < len(words):
+            return [], 0
+        score = Sum(Case(
+            *[When(term=word, then=F('weight') * Value(math.log(1 + documents_count / frequencies[word])))
+              for word in words],
+            output_field=FloatField(),
+        ))
+        matches = (
+            PostTerm.objects.filter(term__in=words).values('post')
+            .annotate(matched=Count('term')).filter(matched=len(words))
+        )
+        total = matches.count()
+        ranked = matches.annotate(score=score).order_by('-score', '-post')[offset:offset + limit]
+        return [row['post'] for row in ranked], total
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'BOARDS_SEARCH_BACKEND', None)
+        if path:
+            _backend = import_string(path)()
+        elif FTS5Backend.is_available():
+            _backend = FTS5Backend()
+        else:
+            _backend = InvertedIndexBackend()
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    global _backend
+    if setting == 'BOARDS_SEARCH_BACKEND':
+        _backend = None
+
+
+def index_posts(posts):
+    get_backend().index_posts(posts)
+
+
+def remove_posts(post_ids):
+    get_backend().remove_posts(post_ids)
+
+
+def search(query, offset=0, limit=20):
+    '''
+    Return the ids of the posts matching every word of `query`, best
+    matches first, and the total number of matches.
+    '''
+    return get_backend().search(query, offset, limit)
@@ -0,0 +1,154 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.db.models import DateTimeField, F, OuterRef, Subquery, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import Profile
+
+from . import notifications, search
+from .cache import INDEX, board_scope, bump_versions
+from .models import Board, NotificationJob, Post, Topic
+
+# Board and Topic carry denormalized `posts_count`, `topics_count` and
+# `last_post` columns, and every author's accounts.Profile a
+# `posts_count`, so the listing pages never aggregate the Post table,
+# and Topic.last_updated follows the latest reply or edit so board_topics
+# can sort on an index.
+# They are kept in step here with single UPDATE statements using F()
+# expressions, so concurrent writers never overwrite each other's counts.
+# `manage.py rebuild_board_stats` and `manage.py reconcile_posts_count`
+# recompute them from scratch.
+#
+# Every write also bumps the page cache versions of the board it touches
+# and of the board index, see `boards.cache`, and updates the search
+# index, see `boards.search`. A new post subscribes its author to the
+# topic and queues one notification job, see `boards.notifications`.
+#
+# Bulk operations that keep these up to date themselves, such as
+# `boards.archive`, run inside `suspended()` to skip every receiver here.
+
+_state = threading.local()
+
+
+@contextmanager
+def suspended():
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def unless_suspended(receiver_function):
+    @wraps(receiver_function)
+    def wrapper(*args, **kwargs):
+        if not getattr(_state, 'suspended', False):
+            return receiver_function(*args, **kwargs)
+    return wrapper
+
+
+def latest_post_id(**filters):
+    return Subquery(
+        Post.objects.filter(**filters).order_by('-created_at', '-pk').values('pk')[:1]
+    )
+
+
+@receiver(post_save, sender=Board)
+@receiver(post_delete, sender=Board)
+@unless_suspended
+def board_changed(sender, instance, **kwargs):
+    bump_versions(INDEX, board_scope(instance.pk))
+
+
+@receiver(post_save, sender=Topic)
+@unless_suspended
+def topic_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Board.objects.filter(pk=instance.board_id).update(topics_count=F('topics_count') + 1)
+    bump_versions(INDEX, board_scope(instance.board_id))
+
+
+@receiver(post_delete, sender=Topic)
+@unless_suspended
+def topic_deleted(sender, instance, **kwargs):
+    Board.objects.filter(pk=instance.board_id).update(topics_count=F('topics_count') - 1)
+    bump_versions(INDEX, board_scope(instance.board_id))
+
+
+@receiver(post_save, sender=Post)
+@unless_suspended
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Topic.objects.filter(pk=instance.topic_id).update(
+            posts_count=F('posts_count') + 1,
+            last_post=instance,
+            last_updated=Greatest('last_updated', Value(instance.created_at, output_field=DateTimeField())),
+        )
+        Board.objects.filter(topics=instance.topic_id).update(
+            posts_count=F('posts_count') + 1,
+            last_post=instance,
+        )
+        Profile.objects.filter(user=instance.created_by_id).update(posts_count=F('posts_count') + 1)
+    elif instance.updated_at and not raw:
+        Topic.objects.filter(pk=instance.topic_id, last_updated__lt=instance.updated_at).update(
+            last_updated=instance.updated_at
+        )
+    bump_versions(INDEX, board_scope(instance.topic.board_id))
+
+
+@receiver(post_delete, sender=Post)
+@unless_suspended
+def post_deleted(sender, instance, **kwargs):
+    # on_delete=SET_NULL has already cleared any `last_post` pointing at
+    # the deleted post, so only those rows need a new latest post.
+    Topic.objects.filter(pk=instance.topic_id).update(posts_count=F('posts_count') - 1)
+    Topic.objects.filter(pk=instance.topic_id, last_post__isnull=True).update(
+        last_post=latest_post_id(topic=OuterRef('pk'))
+    )
+    boards = Board.objects.filter(topics=instance.topic_id)
+    boards.update(posts_count=F('posts_count') - 1)
+    boards.filter(last_post__isnull=True).update(
+        last_post=latest_post_id(topic__board=OuterRef('pk'))
+    )
+    Profile.objects.filter(user=instance.created_by_id).update(posts_count=F('posts_count') - 1)
+    bump_versions(INDEX, board_scope(instance.topic.board_id))
+
+
+@receiver(post_save, sender=Topic)
+@unless_suspended
+def topic_indexed(sender, instance, created, raw=False, **kwargs):
+    # The subject is indexed with the opening post, which a brand new
+    # topic does not have yet.
+    if not created and not raw:
+        first_post = instance.posts.order_by('pk').first()
+        if first_post is not None:
+            first_post.topic = instance
+            search.index_posts([first_post])
+
+
+@receiver(post_save, sender=Post)
+@unless_suspended
+def post_indexed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_posts([instance])
+
+
+@receiver(post_delete, sender=Post)
+@unless_suspended
+def post_unindexed(sender, instance, **kwargs):
+    search.remove_posts([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+@unless_suspended
+def post_notified(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        notifications.subscribe(instance.created_by_id, instance.topic_id)
+        NotificationJob.objects.create(
+            post=instance, topic_id=instance.topic_id, author_id=instance.created_by_id, created_at=instance.created_at
+        )
@@ -0,0 +1,11 @@
+from django import template
+
+from boards import markup
+
+register = template.Library()
+
+
+@register.simple_tag
+def markup_version():
+    '''The renderer version, for the cache keys of rendered posts.'''
+    return markup.MARKUP_VERSION
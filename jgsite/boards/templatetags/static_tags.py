@@ -0,0 +1,41 @@
+import posixpath
+import re
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+CSS_URL = re.compile(r'''url\((['"]?)([^'")]+)\1\)''')
+
+
+@lru_cache(maxsize=None)
+def read_static(path):
+    found = finders.find(path)
+    if found:
+        with open(found, encoding='utf-8') as source:
+            return source.read()
+    with staticfiles_storage.open(path) as source:
+        return source.read().decode('utf-8')
+
+
+@register.simple_tag
+def inline_static(path):
+    '''
+    Output the contents of static file `path`, for inlining critical CSS
+    into a <style> element. Relative url()s are resolved to static URLs,
+    since they no longer sit next to the file they were relative to.
+    '''
+    directory = posixpath.dirname(path)
+
+    def resolve(match):
+        quote, url = match.groups()
+        if url.startswith(('data:', 'http:', 'https:', '/', '#')):
+            return match.group()
+        return 'url({0}{1}{0})'.format(quote, static(posixpath.normpath(posixpath.join(directory, url))))
+
+    return mark_safe(CSS_URL.sub(resolve, read_static(path)))
@@ -0,0 +1,120 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Board, Post, Topic
+
+
+@override_settings(BOARDS_VIEW_COUNT_FLUSH_INTERVAL=3600)
+class ApiTestCase(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(name='Django', description='Django board.')
+        self.user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        self.topic = Topic.objects.create(subject='Hello, world', board=self.board, starter=self.user)
+        self.post = Post.objects.create(message='Lorem ipsum', topic=self.topic, created_by=self.user)
+
+    def get_json(self, url, **headers):
+        response = self.client.get(url, **headers)
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(response['Content-Type'], 'application/json')
+        return response, json.loads(response.content.decode())
+
+
+class ApiBoardsTests(ApiTestCase):
+    def test_boards(self):
+        response, data = self.get_json(reverse('boards:api_boards'))
+        self.assertEquals(len(data['boards']), 1)
+        board = data['boards'][0]
+        self.assertEquals(board['name'], 'Django')
+        self.assertEquals(board['posts_count'], 1)
+        self.assertEquals(board['last_post']['id'], self.post.pk)
+        self.assertEquals(board['last_post']['created_by'], 'john')
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_not_modified(self):
+        url = reverse('boards:api_boards')
+        response = self.client.get(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEquals(response.status_code, 304)
+
+    def test_etag_changes_on_new_post(self):
+        url = reverse('boards:api_boards')
+        etag = self.client.get(url)['ETag']
+        Post.objects.create(message='Reply', topic=self.topic, created_by=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 200)
+        self.assertNotEquals(response['ETag'], etag)
+
+
+class ApiBoardTopicsTests(ApiTestCase):
+    def test_topics(self):
+        response, data = self.get_json(reverse('boards:api_board_topics', kwargs={'board_id': self.board.pk}))
+        self.assertEquals(data['topics'][0]['subject'], 'Hello, world')
+        self.assertEquals(data['topics'][0]['starter'], 'john')
+        # Views change without changing the validators, see boards.api.
+        self.assertNotIn('views', data['topics'][0])
+        self.assertIsNone(data['next'])
+        self.assertIsNone(data['previous'])
+
+    def test_not_found(self):
+        response = self.client.get(reverse('boards:api_board_topics', kwargs={'board_id': 99}))
+        self.assertEquals(response.status_code, 404)
+
+    @override_settings(BOARDS_TOPICS_PER_PAGE=2)
+    def test_pagination(self):
+        for i in range(3):
+            Topic.objects.create(subject='Topic {0}'.format(i), board=self.board, starter=self.user)
+        response, data = self.get_json(reverse('boards:api_board_topics', kwargs={'board_id': self.board.pk}))
+        self.assertEquals(len(data['topics']), 2)
+        response, second = self.get_json(data['next'])
+        self.assertEquals(len(second['topics']), 2)
+        self.assertIsNone(second['next'])
+        self.assertIsNotNone(second['previous'])
+        subjects = [topic['subject'] for topic in data['topics'] + second['topics']]
+        self.assertEquals(len(set(subjects)), 4)
+
+    def test_not_modified_since(self):
+        url = reverse('boards:api_board_topics', kwargs={'board_id': self.board.pk})
+        last_modified = self.client.get(url)['Last-Modified']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEquals(response.status_code, 304)
+
+
+class ApiTopicPostsTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('boards:api_topic_posts', kwargs={'board_id': self.board.pk, 'topic_id': self.topic.pk})
+
+    def test_posts(self):
+        response, data = self.get_json(self.url)
+        self.assertEquals(data['posts'], [{
+            'id': self.post.pk,
+            'message': 'Lorem ipsum',
+            'created_by': 'john',
+            'created_at': data['posts'][0]['created_at'],
+            'updated_at': None,
+        }])
+
+    def test_not_found(self):
+        url = reverse('boards:api_topic_posts', kwargs={'board_id': self.board.pk, 'topic_id': 99})
+        self.assertEquals(self.client.get(url).status_code, 404)
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 304)
+
+    def test_etag_changes_on_edit(self):
+        etag = self.client.get(self.url)['ETag']
+        self.post.message = 'Edited'
+        self.post.updated_at = timezone.now()
+        self.post.save()
+        response, data = self.get_json(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(data['posts'][0]['message'], 'Edited')
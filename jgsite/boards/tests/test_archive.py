@@ -0,0 +1,94 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import archive_batch, archive_topics
+from ..models import ArchivedPost, ArchivedTopic, Board, Post, Topic
+
+
+@override_settings(BOARDS_VIEW_COUNT_FLUSH_INTERVAL=3600)
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(name='Django', description='Django board.')
+        self.user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        self.old = [self.create_topic('Old {0}'.format(i), posts=2) for i in range(3)]
+        self.recent = self.create_topic('Recent', posts=1)
+        Topic.objects.filter(pk__in=[topic.pk for topic in self.old]).update(
+            last_updated=timezone.now() - timedelta(days=400)
+        )
+
+    def create_topic(self, subject, posts):
+        topic = Topic.objects.create(subject=subject, board=self.board, starter=self.user)
+        for i in range(posts):
+            Post.objects.create(message='{0} post {1}'.format(subject, i), topic=topic, created_by=self.user)
+        return topic
+
+    def cutoff(self):
+        return timezone.now() - timedelta(days=365)
+
+    def test_command_moves_old_topics_with_their_posts(self):
+        post_ids = set(Post.objects.filter(topic__in=self.old).values_list('pk', flat=True))
+        output = StringIO()
+        call_command('archive_topics', stdout=output)
+        self.assertIn('Archived 3 topics and 6 posts.', output.getvalue())
+        self.assertEquals(list(Topic.objects.values_list('pk', flat=True)), [self.recent.pk])
+        self.assertEquals(Post.objects.count(), 1)
+        self.assertEquals(
+            set(ArchivedTopic.objects.values_list('pk', flat=True)), {topic.pk for topic in self.old}
+        )
+        self.assertEquals(set(ArchivedPost.objects.values_list('pk', flat=True)), post_ids)
+        archived = ArchivedTopic.objects.get(pk=self.old[0].pk)
+        self.assertEquals((archived.subject, archived.posts_count), ('Old 0', 2))
+
+    def test_counts_keep_archived_content(self):
+        archive_topics(self.cutoff())
+        self.board.refresh_from_db()
+        self.assertEquals((self.board.topics_count, self.board.posts_count), (4, 7))
+        self.assertEquals(self.board.last_post_id, Post.objects.get().pk)
+        self.user.profile.refresh_from_db()
+        self.assertEquals(self.user.profile.posts_count, 7)
+        call_command('rebuild_board_stats', stdout=StringIO())
+        call_command('reconcile_posts_count', stdout=StringIO())
+        self.board.refresh_from_db()
+        self.user.profile.refresh_from_db()
+        self.assertEquals((self.board.topics_count, self.board.posts_count), (4, 7))
+        self.assertEquals(self.user.profile.posts_count, 7)
+
+    def test_batches(self):
+        self.assertEquals(archive_batch(self.cutoff(), batch_size=2), (2, 4))
+        self.assertEquals(archive_topics(self.cutoff(), batch_size=2), (1, 2))
+        self.assertEquals(archive_batch(self.cutoff(), batch_size=2), (0, 0))
+
+    def test_archived_topic_is_read_only(self):
+        archive_topics(self.cutoff())
+        topic = self.old[0]
+        self.client.login(username='john', password='123')
+        url = reverse('boards:topic_posts', kwargs={'board_id': self.board.pk, 'topic_id': topic.pk})
+        response = self.client.get(url)
+        self.assertContains(response, 'Old 0 post 1')
+        self.assertContains(response, 'This topic is archived and read-only.')
+        self.assertNotContains(response, reverse('boards:reply_topic', kwargs={
+            'board_id': self.board.pk, 'topic_id': topic.pk,
+        }))
+        self.assertNotContains(response, '/edit/')
+        reply_url = reverse('boards:reply_topic', kwargs={'board_id': self.board.pk, 'topic_id': topic.pk})
+        self.assertEquals(self.client.post(reply_url, {'message': 'Late reply'}).status_code, 404)
+        self.assertEquals(ArchivedTopic.objects.get(pk=topic.pk).views, 0)
+        response = self.client.get(reverse('boards:topic_archive', kwargs={
+            'board_id': self.board.pk, 'topic_id': topic.pk,
+        }))
+        self.assertIn('Old 0 post 1', b''.join(response.streaming_content).decode())
+
+    def test_archived_topic_listing(self):
+        archive_topics(self.cutoff())
+        response = self.client.get(reverse('boards:archived_topics', kwargs={'board_id': self.board.pk}))
+        self.assertEquals(len(response.context['topics']), 3)
+        self.assertContains(response, 'Old 2')
+        self.assertNotContains(response, 'Recent')
+        response = self.client.get(reverse('boards:board_topics', kwargs={'board_id': self.board.pk}))
+        self.assertNotContains(response, 'Old 2')
@@ -0,0 +1,82 @@
+import re
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import async_views
+from ..archive import archive_topics
+from ..models import Board, Post, ReadMarker, Subscription, Topic
+
+
+@skipUnless(async_views.ASYNC_VIEWS, 'Async views need Django 3.1 or later')
+@override_settings(BOARDS_VIEW_COUNT_FLUSH_INTERVAL=3600, BOARDS_TOPICS_PER_PAGE=1)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(name='Django', description='Django board.')
+        self.user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        self.topic = Topic.objects.create(subject='Hello, world', board=self.board, starter=self.user)
+        Topic.objects.create(subject='Older topic', board=self.board, starter=self.user)
+        self.post = Post.objects.create(message='Lorem ipsum dolor sit amet', topic=self.topic, created_by=self.user)
+        self.topic_kwargs = {'board_id': self.board.pk, 'topic_id': self.topic.pk}
+
+    def assertSameAsSync(self, name, **kwargs):
+        sync = self.client.get(reverse('boards:' + name, kwargs=kwargs))
+        response = self.client.get(reverse('boards:async_' + name, kwargs=kwargs))
+        self.assertEquals(response.status_code, 200)
+        # CSRF tokens differ from one response to the next.
+        strip = lambda content: re.sub(rb'name="csrfmiddlewaretoken" value="[^"]*"', b'', content)
+        self.assertEquals(strip(response.content), strip(sync.content))
+
+    def test_home(self):
+        self.assertSameAsSync('home')
+
+    def test_board_topics(self):
+        self.assertSameAsSync('board_topics', board_id=self.board.pk)
+
+    def test_topic_posts(self):
+        self.assertSameAsSync('topic_posts', **self.topic_kwargs)
+
+    def test_board_topics_authenticated(self):
+        self.client.login(username='john', password='123')
+        self.assertSameAsSync('board_topics', board_id=self.board.pk)
+        response = self.client.get(reverse('boards:async_board_topics', kwargs={'board_id': self.board.pk}))
+        self.assertContains(response, '>New</span>')
+
+    def test_topic_posts_authenticated(self):
+        self.client.login(username='john', password='123')
+        self.assertSameAsSync('topic_posts', **self.topic_kwargs)
+
+    def test_topic_posts_subscribed(self):
+        Subscription.objects.get_or_create(topic=self.topic, user=self.user)
+        self.client.login(username='john', password='123')
+        self.assertSameAsSync('topic_posts', **self.topic_kwargs)
+        response = self.client.get(reverse('boards:async_topic_posts', kwargs=self.topic_kwargs))
+        self.assertContains(response, 'Unfollow')
+
+    def test_topic_posts_marks_read(self):
+        self.client.login(username='john', password='123')
+        self.client.get(reverse('boards:async_topic_posts', kwargs=self.topic_kwargs))
+        self.assertEquals(ReadMarker.objects.get(user=self.user, topic=self.topic).last_read_post_id, self.post.pk)
+        response = self.client.get(reverse('boards:async_board_topics', kwargs={'board_id': self.board.pk}))
+        self.assertNotContains(response, '>New</span>')
+
+    def test_archived_topic(self):
+        Topic.objects.filter(pk=self.topic.pk).update(last_updated=timezone.now() - timedelta(days=400))
+        archive_topics(timezone.now() - timedelta(days=365))
+        self.client.login(username='john', password='123')
+        self.assertSameAsSync('topic_posts', **self.topic_kwargs)
+        response = self.client.get(reverse('boards:async_topic_posts', kwargs=self.topic_kwargs))
+        self.assertContains(response, 'This topic is archived and read-only.')
+        self.assertFalse(ReadMarker.objects.exists())
+
+    def test_not_found(self):
+        url = reverse('boards:async_topic_posts', kwargs=dict(self.topic_kwargs, topic_id=99))
+        self.assertEquals(self.client.get(url).status_code, 404)
+
+    def test_invalid_cursor(self):
+        url = reverse('boards:async_board_topics_page', kwargs={'board_id': self.board.pk, 'cursor': 'nbogus'})
+        self.assertEquals(self.client.get(url).status_code, 404)
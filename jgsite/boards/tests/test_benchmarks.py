@@ -0,0 +1,86 @@
+import copy
+import os
+import tempfile
+from io import StringIO
+from unittest import skipIf, skipUnless
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase
+
+from .. import async_views, benchmarks
+from ..models import Board, Post, Topic
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        call_command('seed_boards', boards=2, topics=6, posts=30, users=3, chunk_size=7, stdout=StringIO())
+        directory = tempfile.mkdtemp()
+        self.output = os.path.join(directory, 'benchmark.json')
+        self.baseline = os.path.join(directory, 'baseline.json')
+        self.addCleanup(lambda: [os.remove(os.path.join(directory, name)) for name in os.listdir(directory)])
+
+    def test_seed(self):
+        self.assertEquals(Board.objects.count(), 2)
+        self.assertEquals(Topic.objects.count(), 6)
+        self.assertEquals(Post.objects.count(), 30)
+        self.assertFalse(Topic.objects.filter(posts_count=0).exists())
+        self.assertEquals(sum(Board.objects.values_list('posts_count', flat=True)), 30)
+
+    def test_benchmark(self):
+        call_command('benchmark_boards', requests=3, warmup=1, output=self.output, stdout=StringIO())
+        results = benchmarks.load(self.output)
+        self.assertEquals(set(results['views']), {
+            'home', 'board_topics', 'board_topics_deep', 'topic_posts', 'reply_topic', 'reply_topic_post',
+        })
+        for result in results['views'].values():
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        # Anonymous home page views come from the page cache
+        self.assertEquals(results['views']['home']['queries_per_request'], 0)
+        self.assertGreater(results['views']['reply_topic']['queries_per_request'], 0)
+        self.assertEquals(results['meta']['posts'], Post.objects.count())
+
+    def test_compare(self):
+        call_command('benchmark_boards', requests=2, warmup=0, view=['topic_posts'], output=self.baseline,
+                     stdout=StringIO())
+        baseline = benchmarks.load(self.baseline)
+        results = copy.deepcopy(baseline)
+        self.assertEquals(benchmarks.compare(results, baseline), [])
+        results['views']['topic_posts']['p95_ms'] = baseline['views']['topic_posts']['p95_ms'] * 2
+        results['views']['topic_posts']['queries_per_request'] += 1
+        self.assertEquals(len(benchmarks.compare(results, baseline)), 2)
+
+    def test_compare_command_fails_on_regression(self):
+        call_command('benchmark_boards', requests=2, warmup=0, view=['home'], authenticated=True,
+                     output=self.baseline, stdout=StringIO())
+        baseline = benchmarks.load(self.baseline)
+        baseline['views']['home']['queries_per_request'] = 0
+        benchmarks.save(baseline, self.baseline)
+        with self.assertRaisesMessage(CommandError, 'home: queries per request'):
+            call_command('benchmark_boards', requests=2, warmup=0, view=['home'], authenticated=True,
+                         output=self.output, compare=self.baseline, stdout=StringIO())
+
+
+class InterfaceBenchmarkTests(TransactionTestCase):
+    # The WSGI and ASGI handlers run requests on their own threads and
+    # database connections, which only see committed data.
+    def setUp(self):
+        call_command('seed_boards', boards=1, topics=2, posts=4, users=2, stdout=StringIO())
+        directory = tempfile.mkdtemp()
+        self.output = os.path.join(directory, 'benchmark-asgi.json')
+        self.addCleanup(lambda: [os.remove(os.path.join(directory, name)) for name in os.listdir(directory)])
+
+    @skipUnless(async_views.ASYNC_VIEWS, 'Async views need Django 3.1 or later')
+    def test_throughput(self):
+        call_command('benchmark_asgi', requests=4, concurrency=2, output=self.output, stdout=StringIO())
+        results = benchmarks.load(self.output)
+        self.assertEquals(set(results['views']), {'home', 'board_topics', 'topic_posts'})
+        for result in results['views'].values():
+            self.assertEquals(set(result), {'wsgi', 'asgi_sync', 'asgi_async'})
+            for mode in result.values():
+                self.assertEquals(mode['errors'], 0)
+                self.assertGreater(mode['requests_per_second'], 0)
+
+    @skipIf(async_views.ASYNC_VIEWS, 'Async views are available')
+    def test_needs_async_views(self):
+        with self.assertRaisesMessage(CommandError, 'Django 3.1 or later'):
+            call_command('benchmark_asgi', output=self.output, stdout=StringIO())
@@ -0,0 +1,159 @@
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Profile
+
+from ..models import Board, Post, Topic
+
+
+@override_settings(RATELIMIT_ENABLE=False)
+class BoardStatsTestCase(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(name='Django', description='Django board.')
+        self.user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        self.client.login(username='john', password='123')
+
+    def new_topic(self, subject='Hello, world'):
+        url = reverse('boards:new_topic', kwargs={'board_id': self.board.pk})
+        self.client.post(url, {'subject': subject, 'message': 'Lorem ipsum dolor sit amet'})
+        return Topic.objects.latest('pk')
+
+    def reply(self, topic, message='hello, world!'):
+        url = reverse('boards:reply_topic', kwargs={'board_id': self.board.pk, 'topic_id': topic.pk})
+        self.client.post(url, {'message': message})
+        return Post.objects.latest('pk')
+
+    def assertStats(self, board_posts, board_topics, topic=None, topic_posts=None):
+        self.board.refresh_from_db()
+        self.assertEquals(self.board.posts_count, board_posts)
+        self.assertEquals(self.board.topics_count, board_topics)
+        self.assertEquals(self.board.last_post, Post.objects.filter(topic__board=self.board).order_by('-created_at').first())
+        if topic is not None:
+            topic.refresh_from_db()
+            self.assertEquals(topic.posts_count, topic_posts)
+            self.assertEquals(topic.last_post, topic.posts.order_by('-created_at').first())
+
+
+class BoardStatsTests(BoardStatsTestCase):
+    def test_new_topic(self):
+        topic = self.new_topic()
+        self.assertStats(1, 1, topic, 1)
+
+    def test_reply(self):
+        topic = self.new_topic()
+        self.reply(topic)
+        self.reply(topic)
+        self.assertStats(3, 1, topic, 3)
+        self.assertEquals(topic.get_replies_count(), 2)
+
+    def test_delete_last_post(self):
+        topic = self.new_topic()
+        self.reply(topic).delete()
+        self.assertStats(1, 1, topic, 1)
+
+    def test_delete_topic(self):
+        topic = self.new_topic()
+        self.reply(topic)
+        other = self.new_topic('Another topic')
+        topic.delete()
+        self.assertStats(1, 1, other, 1)
+
+
+class LastUpdatedTests(BoardStatsTestCase):
+    def test_reply(self):
+        topic = self.new_topic()
+        post = self.reply(topic)
+        topic.refresh_from_db()
+        self.assertEquals(topic.last_updated, post.created_at)
+
+    def test_edit(self):
+        topic = self.new_topic()
+        post = topic.posts.get()
+        post.updated_at = timezone.now() + timedelta(minutes=5)
+        post.save()
+        topic.refresh_from_db()
+        self.assertEquals(topic.last_updated, post.updated_at)
+
+    def test_older_edit_does_not_move_back(self):
+        topic = self.new_topic()
+        post = topic.posts.get()
+        self.reply(topic)
+        topic.refresh_from_db()
+        last_updated = topic.last_updated
+        post.updated_at = last_updated - timedelta(minutes=5)
+        post.save()
+        topic.refresh_from_db()
+        self.assertEquals(topic.last_updated, last_updated)
+
+    def test_backfill(self):
+        topic = self.new_topic()
+        post = self.reply(topic)
+        edited = topic.posts.earliest('pk')
+        Post.objects.filter(pk=edited.pk).update(updated_at=post.created_at + timedelta(minutes=5))
+        empty = Topic.objects.create(subject='Empty', board=self.board, starter=self.user)
+        created = empty.last_updated
+        Topic.objects.filter(pk=topic.pk).update(last_updated=post.created_at - timedelta(days=1))
+        call_command('backfill_last_updated', batch_size=1, stdout=StringIO())
+        topic.refresh_from_db()
+        empty.refresh_from_db()
+        self.assertEquals(topic.last_updated, post.created_at + timedelta(minutes=5))
+        self.assertEquals(empty.last_updated, created)
+
+
+class RebuildBoardStatsTests(BoardStatsTestCase):
+    def test_rebuild(self):
+        topic = self.new_topic()
+        self.reply(topic)
+        empty = Topic.objects.create(subject='Empty', board=self.board, starter=self.user)
+        Board.objects.update(posts_count=0, topics_count=0, last_post=None)
+        Topic.objects.update(posts_count=42, last_post=None)
+        call_command('rebuild_board_stats', stdout=StringIO())
+        self.assertStats(2, 2, topic, 2)
+        empty.refresh_from_db()
+        self.assertEquals(empty.posts_count, 0)
+        self.assertIsNone(empty.last_post)
+
+
+class ProfilePostsCountTests(BoardStatsTestCase):
+    def posts_count(self, user=None):
+        return Profile.objects.get(user=user or self.user).posts_count
+
+    def test_new_topic_and_replies(self):
+        topic = self.new_topic()
+        self.reply(topic)
+        self.assertEquals(self.posts_count(), 2)
+
+    def test_delete(self):
+        topic = self.new_topic()
+        self.reply(topic).delete()
+        self.assertEquals(self.posts_count(), 1)
+        topic.delete()
+        self.assertEquals(self.posts_count(), 0)
+
+    def test_reconcile(self):
+        topic = self.new_topic()
+        self.reply(topic)
+        other = User.objects.create_user(username='jane', email='jane@doe.com', password='123')
+        Post.objects.create(message='Hi', topic=topic, created_by=other)
+        Profile.objects.filter(user=self.user).update(posts_count=42)
+        Profile.objects.filter(user=other).delete()
+        output = StringIO()
+        call_command('reconcile_posts_count', stdout=output)
+        self.assertEquals(self.posts_count(), 2)
+        self.assertEquals(self.posts_count(other), 1)
+        self.assertIn('Created 1 profiles and fixed 1 post counts.', output.getvalue())
+
+    def test_migration_backfills_profiles(self):
+        topic = self.new_topic()
+        self.reply(topic)
+        Profile.objects.all().delete()
+        import_module('accounts.migrations.0002_backfill_profiles').create_profiles(apps, None)
+        self.assertEquals(self.posts_count(), 2)
@@ -0,0 +1,51 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from ..management.commands.build_critical_css import critical_rules, selector_used, used_names
+from ..templatetags.static_tags import inline_static
+
+
+class CriticalCssTests(TestCase):
+    def setUp(self):
+        self.names = used_names(
+            '<div class="card {% if x %}active{% endif %}"><a id="top" class="btn {{ extra }}">Hi</a></div>'
+        )
+
+    def test_used_names(self):
+        tags, classes, ids = self.names
+        self.assertEquals(tags, {'html', 'body', 'div', 'a'})
+        self.assertEquals(classes, {'card', 'active', 'btn'})
+        self.assertEquals(ids, {'top'})
+
+    def test_selector_used(self):
+        self.assertTrue(selector_used('div.card > a.btn', *self.names))
+        self.assertTrue(selector_used('.card:not(.other)::after', *self.names))
+        self.assertTrue(selector_used('a#top[href]', *self.names))
+        self.assertFalse(selector_used('.card .table', *self.names))
+        self.assertFalse(selector_used('span', *self.names))
+        self.assertFalse(selector_used('.btn:hover', *self.names))
+
+    def test_critical_rules(self):
+        css = (
+            '@charset "UTF-8";.card,.table{color:red}.table{color:blue}'
+            '@media (min-width:576px){.btn{margin:0}.table{margin:0}}@media (min-width:768px){.table{margin:0}}'
+            '@media print{.card{color:#000}}@keyframes spin{from{top:0}}'
+            "@font-face{font-family: 'Roboto';  src: url(a.woff2)}"
+        )
+        self.assertEquals(critical_rules(css, *self.names), (
+            '.card{color:red}@media (min-width:576px){.btn{margin:0}}'
+            "@font-face{font-family: 'Roboto'; src: url(a.woff2)}"
+        ))
+
+
+class InlineStaticTests(TestCase):
+    def test_relative_urls_resolved(self):
+        css = inline_static('css/critical.css')
+        self.assertIn("url('/static/fonts/roboto-400.woff2')", css)
+        self.assertNotIn('../fonts/', css)
+
+    def test_base_template(self):
+        response = self.client.get(reverse('boards:home'))
+        self.assertContains(response, '<style>@font-face{')
+        self.assertNotContains(response, 'fonts.googleapis.com')
+        self.assertContains(response, 'rel="preload"', count=2)
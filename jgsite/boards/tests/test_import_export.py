@@ -0,0 +1,140 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..archive import archive_topics
+from ..models import ArchivedPost, ArchivedTopic, Board, Post, Topic
+
+
+class ImportExportTests(TestCase):
+    def setUp(self):
+        self.john = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        self.jane = User.objects.create_user(username='jane', email='jane@doe.com', password='123')
+        board = Board.objects.create(name='Django', description='Django board.')
+        Board.objects.create(name='Empty', description='Nothing here.')
+        for i in range(3):
+            topic = Topic.objects.create(subject='Topic {0}'.format(i), board=board, starter=self.john, views=i)
+            for j in range(4):
+                Post.objects.create(message='Post {0}.{1}'.format(i, j), topic=topic, created_by=self.jane)
+        Post.objects.filter(pk=Post.objects.earliest('pk').pk).update(updated_at=timezone.now(), updated_by=self.john)
+        directory = tempfile.mkdtemp()
+        self.path = os.path.join(directory, 'boards.ndjson')
+        self.addCleanup(os.rmdir, directory)
+        self.addCleanup(lambda: os.path.exists(self.path) and os.remove(self.path))
+
+    def export(self, **options):
+        call_command('export_boards', output=self.path, stderr=StringIO(), **options)
+        with open(self.path) as export:
+            return [json.loads(line) for line in export]
+
+    def import_(self, **options):
+        output = StringIO()
+        call_command('import_boards', self.path, stdout=output, **options)
+        return output.getvalue()
+
+    def snapshot(self):
+        return {
+            'boards': list(Board.objects.order_by('name').values_list('name', 'description')),
+            'topics': list(Topic.objects.order_by('subject').values_list(
+                'subject', 'board__name', 'starter__username', 'views', 'last_updated'
+            )),
+            'posts': list(Post.objects.order_by('message').values_list(
+                'message', 'topic__subject', 'created_by__username', 'created_at',
+                'updated_at', 'updated_by__username'
+            )),
+        }
+
+    def test_export_format(self):
+        records = self.export()
+        self.assertEquals([record['model'] for record in records], ['board'] * 2 + ['topic'] * 3 + ['post'] * 12)
+        self.assertEquals(records[2]['starter'], 'john')
+        self.assertEquals(records[5]['created_by'], 'jane')
+
+    def test_export_single_board(self):
+        records = self.export(boards=['Empty'])
+        self.assertEquals(records, [{'model': 'board', 'id': records[0]['id'], 'name': 'Empty', 'description': 'Nothing here.'}])
+
+    def test_round_trip(self):
+        before = self.snapshot()
+        self.export(chunk_size=5)
+        Board.objects.all().delete()
+        output = self.import_(chunk_size=5)
+        self.assertEquals(self.snapshot(), before)
+        self.assertIn('Imported 2 boards, 3 topics and 12 posts', output)
+        self.assertIn('rows/s', output)
+
+    def test_stats_are_rebuilt(self):
+        self.export()
+        Board.objects.all().delete()
+        self.import_()
+        board = Board.objects.get(name='Django')
+        self.assertEquals(board.posts_count, 12)
+        self.assertEquals(board.topics_count, 3)
+        self.assertEquals(board.last_post, Post.objects.latest('created_at'))
+
+    def test_new_rows_after_import(self):
+        self.export()
+        Board.objects.all().delete()
+        self.import_()
+        topic = Topic.objects.create(subject='After import', board=Board.objects.get(name='Django'), starter=self.john)
+        self.assertEquals(topic.pk, Topic.objects.order_by('-pk').values_list('pk', flat=True)[0])
+
+    def test_unknown_users(self):
+        self.export()
+        Board.objects.all().delete()
+        self.jane.delete()
+        with self.assertRaisesMessage(CommandError, 'Unknown users: jane'):
+            self.import_()
+
+    def test_create_users(self):
+        self.export()
+        Board.objects.all().delete()
+        self.jane.delete()
+        self.import_(create_users=True)
+        jane = User.objects.get(username='jane')
+        self.assertFalse(jane.has_usable_password())
+        self.assertEquals(Post.objects.filter(created_by=jane).count(), 12)
+
+    def archive_first_topic(self):
+        topic = Topic.objects.get(subject='Topic 0')
+        Topic.objects.filter(pk=topic.pk).update(last_updated=timezone.now() - timedelta(days=400))
+        archive_topics(timezone.now() - timedelta(days=365))
+
+    def archive_snapshot(self):
+        return {
+            'topics': list(ArchivedTopic.objects.values_list(
+                'subject', 'board__name', 'starter__username', 'views', 'posts_count', 'last_updated'
+            )),
+            'posts': list(ArchivedPost.objects.order_by('message').values_list(
+                'message', 'topic__subject', 'created_by__username', 'created_at'
+            )),
+        }
+
+    def test_export_archived_content(self):
+        self.archive_first_topic()
+        records = self.export()
+        self.assertEquals([record['model'] for record in records], ['board'] * 2 + ['topic'] * 3 + ['post'] * 12)
+        archived = [record for record in records if record.get('archived')]
+        self.assertEquals([record['model'] for record in archived], ['topic'] + ['post'] * 4)
+        self.assertEquals(archived[0]['subject'], 'Topic 0')
+
+    def test_round_trip_archived_content(self):
+        self.archive_first_topic()
+        before = self.snapshot(), self.archive_snapshot()
+        self.export()
+        Board.objects.all().delete()
+        output = self.import_()
+        self.assertEquals((self.snapshot(), self.archive_snapshot()), before)
+        self.assertIn('Imported 2 boards, 3 topics and 12 posts (1 topics archived)', output)
+        board = Board.objects.get(name='Django')
+        self.assertEquals((board.topics_count, board.posts_count), (3, 12))
+        # New topics do not reuse the ids of archived ones.
+        topic = Topic.objects.create(subject='After import', board=board, starter=self.john)
+        self.assertFalse(ArchivedTopic.objects.filter(pk=topic.pk).exists())
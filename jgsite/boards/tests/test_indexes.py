@@ -0,0 +1,67 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Board, Post, Topic
+from ..pagination import KeysetPaginator, NEXT, encode_cursor
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite specific')
+class QueryPlanTests(TestCase):
+    '''
+    The hot queries of the boards views must be answered from an index,
+    never by a full scan of the topic or post tables.
+    '''
+    def setUp(self):
+        self.board = Board.objects.create(name='Django', description='Django board.')
+        self.user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        self.topic = Topic.objects.create(subject='Hello, world', board=self.board, starter=self.user)
+        Post.objects.create(message='Lorem ipsum dolor sit amet', topic=self.topic, created_by=self.user)
+
+    def query_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertUsesIndex(self, queryset, table, index):
+        plan = self.query_plan(queryset)
+        for step in plan:
+            words = step.split()
+            if words[0] == 'SCAN' and table in words:
+                self.assertIn('USING', words, 'Full scan of {0}: {1}'.format(table, plan))
+        self.assertTrue(any(index in step for step in plan), '{0} not used: {1}'.format(index, plan))
+
+    def keyset_queryset(self, queryset, field, descending):
+        paginator = KeysetPaginator(queryset, field, 20, descending=descending)
+        _, page_queryset = paginator.get_queryset(encode_cursor(NEXT, timezone.now(), 1))
+        return page_queryset
+
+    def test_board_topics(self):
+        topics = self.board.topics.order_by('-last_updated', '-pk')[:21]
+        self.assertUsesIndex(topics, 'boards_topic', 'boards_topic_board_updated_idx')
+
+    def test_board_topics_next_page(self):
+        topics = self.keyset_queryset(self.board.topics.all(), 'last_updated', descending=True)
+        self.assertUsesIndex(topics, 'boards_topic', 'boards_topic_board_updated_idx')
+
+    def test_topic_posts(self):
+        posts = self.topic.posts.order_by('created_at', 'pk')[:21]
+        self.assertUsesIndex(posts, 'boards_post', 'boards_post_topic_created_idx')
+
+    def test_topic_posts_next_page(self):
+        posts = self.keyset_queryset(self.topic.posts.all(), 'created_at', descending=False)
+        self.assertUsesIndex(posts, 'boards_post', 'boards_post_topic_created_idx')
+
+    def test_board_last_post(self):
+        posts = Post.objects.filter(topic__board=self.board).order_by('-created_at', '-pk')[:1]
+        self.assertUsesIndex(posts, 'boards_post', 'boards_post_')
+
+    def test_author_posts_count(self):
+        counts = Post.objects.filter(created_by__in=[self.user.pk]).order_by() \
+            .values('created_by').annotate(total=Count('pk'))
+        self.assertUsesIndex(counts, 'boards_post', 'created_by_id')
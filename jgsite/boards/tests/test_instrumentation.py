@@ -0,0 +1,73 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import instrumentation
+from ..models import Board, Post, Topic
+
+MIDDLEWARE = settings.MIDDLEWARE + ['boards.instrumentation.InstrumentationMiddleware']
+
+
+class FingerprintTests(TestCase):
+    def test_in_lists_are_folded(self):
+        self.assertEquals(
+            instrumentation.fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            instrumentation.fingerprint('SELECT * FROM t WHERE id IN (%s, %s)'),
+        )
+
+    def test_duplicates(self):
+        metrics = instrumentation.RequestMetrics()
+        for sql in ['SELECT 1', 'SELECT %s', 'SELECT %s']:
+            metrics(lambda *args: None, sql, [], False, {})
+        self.assertEquals(metrics.query_count, 3)
+        self.assertEquals(metrics.duplicates(), {'SELECT %s': 2})
+
+
+@override_settings(MIDDLEWARE=MIDDLEWARE, BOARDS_INSTRUMENTATION_SAMPLE_RATE=1.0, BOARDS_VIEW_COUNT_FLUSH_INTERVAL=3600)
+class InstrumentationMiddlewareTests(TestCase):
+    def setUp(self):
+        instrumentation.reset()
+        board = Board.objects.create(name='Django', description='Django board.')
+        user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        topic = Topic.objects.create(subject='Hello, world', board=board, starter=user)
+        Post.objects.create(message='Lorem ipsum', topic=topic, created_by=user)
+        self.url = reverse('boards:topic_posts', kwargs={'board_id': board.pk, 'topic_id': topic.pk})
+        self.stats_url = reverse('boards:request_stats')
+
+    def test_server_timing_header(self):
+        response = self.client.get(self.url)
+        timing = response['Server-Timing']
+        for metric in ('sql;dur=', 'template;dur=', 'view;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+        self.assertRegex(timing, r'desc="[1-9]\d* queries, 0 duplicated"')
+
+    @override_settings(BOARDS_INSTRUMENTATION_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_have_no_header(self):
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEquals(instrumentation.summary(), {})
+
+    def test_stats_per_url_name(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        stats = instrumentation.summary()['boards:topic_posts']
+        self.assertEquals(stats['samples'], 2)
+        self.assertEquals(set(stats['total_ms']), {'p50', 'p95', 'p99'})
+        self.assertGreater(stats['queries']['p50'], 0)
+        self.assertGreater(stats['template_ms']['p99'], 0)
+        self.assertGreaterEqual(stats['total_ms']['p50'], stats['view_ms']['p50'])
+
+    def test_stats_endpoint_requires_staff(self):
+        response = self.client.get(self.stats_url)
+        self.assertEquals(response.status_code, 302)
+        User.objects.create_user(username='admin', email='admin@doe.com', password='123', is_staff=True)
+        self.client.login(username='admin', password='123')
+        self.client.get(self.url)
+        response = self.client.get(self.stats_url)
+        self.assertEquals(response.status_code, 200)
+        data = json.loads(response.content.decode())
+        self.assertEquals(data['sample_rate'], 1.0)
+        self.assertIn('boards:topic_posts', data['views'])
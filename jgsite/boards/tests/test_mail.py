@@ -0,0 +1,162 @@
+import smtplib
+import socketserver
+import threading
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives, get_connection, send_mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..mail import send_queued
+from ..models import QueuedEmail
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    '''Just enough SMTP to accept mail, like a local debugging server.'''
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost')
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line[:4].upper()
+            if not line or command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            if command in ('EHLO', 'HELO'):
+                self.reply('250 localhost')
+            elif command == 'RCPT' and 'refused' in line:
+                self.reply('550 No such user')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                for data_line in iter(self.rfile.readline, b'.\r\n'):
+                    data.append(data_line)
+                self.server.messages.append(b''.join(data))
+                self.reply('250 OK')
+            else:
+                self.reply('250 OK')
+
+
+class DisconnectedBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('localhost', 0), SMTPHandler)
+        self.connections = 0
+        self.messages = []
+
+
+@override_settings(EMAIL_BACKEND='boards.mail.QueueBackend')
+class QueueBackendTests(TestCase):
+    def test_send_mail_only_queues(self):
+        send_mail('Hello', 'Body', 'from@example.com', ['to@example.com', 'cc@example.com'])
+        self.assertEquals(len(mail.outbox), 0)
+        queued = QueuedEmail.objects.get()
+        self.assertEquals(queued.recipients, 'to@example.com\ncc@example.com')
+        self.assertIn(b'Subject: Hello', bytes(queued.message))
+
+    def test_password_reset_is_queued(self):
+        User.objects.create_user(username='john', email='john@doe.com', password='123')
+        response = self.client.post(reverse('accounts:password_reset'), {'email': 'john@doe.com'})
+        self.assertRedirects(response, reverse('accounts:password_reset_done'))
+        self.assertEquals(QueuedEmail.objects.get().recipients, 'john@doe.com')
+
+
+@override_settings(
+    EMAIL_BACKEND='boards.mail.QueueBackend',
+    BOARDS_MAIL_QUEUE_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class SendQueuedTests(TestCase):
+    def queue(self, count, to='to@example.com'):
+        for number in range(count):
+            message = EmailMultiAlternatives('Message {0}'.format(number), 'Body', 'from@example.com', [to])
+            message.attach_alternative('<p>Body</p>', 'text/html')
+            message.send()
+
+    def test_sends_and_deletes_in_batches(self):
+        self.queue(5)
+        output = StringIO()
+        call_command('send_queued_mail', batch_size=2, stdout=output)
+        self.assertEquals(len(mail.outbox), 5)
+        self.assertFalse(QueuedEmail.objects.exists())
+        self.assertIn('Sent 5 messages, 0 failed.', output.getvalue())
+
+    def test_sends_message_as_queued(self):
+        self.queue(1)
+        send_queued()
+        message = mail.outbox[0].message()
+        self.assertEquals(message['Subject'], 'Message 0')
+        self.assertEquals(message.get_content_type(), 'multipart/alternative')
+
+    def test_nothing_due(self):
+        self.queue(1)
+        QueuedEmail.objects.update(next_attempt_at=None)
+        self.assertEquals(send_queued(), (0, 0))
+        self.assertEquals(len(mail.outbox), 0)
+
+
+@override_settings(
+    EMAIL_BACKEND='boards.mail.QueueBackend',
+    BOARDS_MAIL_QUEUE_MAX_ATTEMPTS=2,
+    BOARDS_MAIL_QUEUE_RETRY_DELAY=60,
+)
+class SMTPDeliveryTests(TestCase):
+    def setUp(self):
+        self.server = SMTPServer()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def connection(self):
+        return get_connection(
+            'django.core.mail.backends.smtp.EmailBackend',
+            host='localhost', port=self.server.server_address[1], timeout=5,
+        )
+
+    def test_one_connection_for_all_messages(self):
+        for number in range(5):
+            send_mail('Message {0}'.format(number), 'Body', 'from@example.com', ['to@example.com'])
+        self.assertEquals(send_queued(batch_size=2, connection=self.connection()), (5, 0))
+        self.assertEquals(self.server.connections, 1)
+        self.assertEquals(len(self.server.messages), 5)
+        self.assertIn(b'Subject: Message 0\r\n', self.server.messages[0])
+
+    def test_refused_recipient_is_given_up(self):
+        send_mail('Hello', 'Body', 'from@example.com', ['refused@example.com'])
+        send_mail('Hello', 'Body', 'from@example.com', ['to@example.com'])
+        self.assertEquals(send_queued(connection=self.connection()), (1, 1))
+        failed = QueuedEmail.objects.get()
+        self.assertEquals(failed.recipients, 'refused@example.com')
+        self.assertIsNone(failed.next_attempt_at)
+        self.assertIn('No such user', failed.last_error)
+
+    def test_failures_are_retried_with_backoff(self):
+        send_mail('Hello', 'Body', 'from@example.com', ['to@example.com'])
+        self.assertEquals(send_queued(connection=DisconnectedBackend()), (0, 1))
+        queued = QueuedEmail.objects.get()
+        self.assertEquals(queued.attempts, 1)
+        self.assertIn('SMTPServerDisconnected', queued.last_error)
+        self.assertTrue(59 <= (queued.next_attempt_at - queued.created_at).total_seconds() <= 65)
+        # Not due yet.
+        self.assertEquals(send_queued(connection=DisconnectedBackend()), (0, 0))
+        QueuedEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEquals(send_queued(connection=DisconnectedBackend()), (0, 1))
+        queued.refresh_from_db()
+        self.assertEquals(queued.attempts, 2)
+        self.assertIsNone(queued.next_attempt_at)
+        self.assertEquals(send_queued(connection=self.connection()), (0, 0))
@@ -0,0 +1,98 @@
+from io import StringIO
+from unittest import mock, skipIf
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import markup
+from ..markup import render, sanitize
+from ..models import Board, Post, Topic
+
+
+class SanitizeTests(TestCase):
+    def test_keeps_whitelisted_tags(self):
+        html = '<p>Hello <strong>world</strong></p>'
+        self.assertEquals(sanitize(html), html)
+
+    def test_drops_other_tags_and_attributes(self):
+        html = '<p onclick="steal()">Hi<script>alert(1)</script><iframe src="x"></iframe></p>'
+        self.assertEquals(sanitize(html), '<p>Hialert(1)</p>')
+
+    def test_drops_unsafe_urls(self):
+        self.assertEquals(sanitize('<a href="javascript:alert(1)">x</a>'), '<a rel="nofollow">x</a>')
+        self.assertEquals(sanitize('<a href="java\tscript:alert(1)">x</a>'), '<a rel="nofollow">x</a>')
+        self.assertEquals(sanitize('<img src="data:image/png;base64,AAAA">'), '<img>')
+
+    def test_links_are_nofollow(self):
+        self.assertEquals(
+            sanitize('<a href="https://example.com/?a=1&b=2">x</a>'),
+            '<a href="https://example.com/?a=1&amp;b=2" rel="nofollow">x</a>'
+        )
+
+    def test_text_is_escaped(self):
+        self.assertEquals(sanitize('<p>1 &lt; 2 &amp; "3"</p>'), '<p>1 &lt; 2 &amp; &quot;3&quot;</p>')
+
+
+class RenderTests(TestCase):
+    def test_raw_html_is_escaped(self):
+        html = render('<script>alert(1)</script>')
+        self.assertNotIn('<script>', html)
+        self.assertIn('&lt;script&gt;', html)
+
+    @skipIf(markup.markdown is None, 'Needs the markdown package.')
+    def test_markdown(self):
+        html = render('Some **bold** text and a [link](https://example.com).\n\n```\ncode\n```')
+        self.assertIn('<strong>bold</strong>', html)
+        self.assertIn('<a href="https://example.com" rel="nofollow">link</a>', html)
+        self.assertIn('<pre><code>code\n</code></pre>', html)
+
+    @skipIf(markup.markdown is None, 'Needs the markdown package.')
+    def test_markdown_link_with_unsafe_url(self):
+        self.assertNotIn('javascript', render('[x](javascript:alert(1))'))
+
+    @skipIf(markup.markdown is not None, 'Only without the markdown package.')
+    def test_plain_text_fallback(self):
+        self.assertEquals(render('Line one\nline two\n\n**Next**'), '<p>Line one<br>line two</p>\n\n<p>**Next**</p>')
+
+
+class PostMessageHtmlTests(TestCase):
+    def setUp(self):
+        board = Board.objects.create(name='Django', description='Django board.')
+        user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        topic = Topic.objects.create(subject='Hello, world', board=board, starter=user)
+        self.post = Post.objects.create(message='First <b>post</b>', topic=topic, created_by=user)
+
+    def test_rendered_on_create(self):
+        self.assertEquals(self.post.message_html, render('First <b>post</b>'))
+
+    def test_rendered_again_when_message_changes(self):
+        self.post.message = 'Edited'
+        self.post.save(update_fields=['message'])
+        self.post.refresh_from_db()
+        self.assertEquals(self.post.message_html, render('Edited'))
+
+    def test_not_rendered_when_message_is_not_saved(self):
+        Post.objects.filter(pk=self.post.pk).update(message_html='<p>Stored</p>')
+        self.post.refresh_from_db()
+        self.post.save(update_fields=['updated_at'])
+        self.post.refresh_from_db()
+        self.assertEquals(self.post.message_html, '<p>Stored</p>')
+
+    def test_render_posts_command(self):
+        Post.objects.filter(pk=self.post.pk).update(message_html='')
+        output = StringIO()
+        call_command('render_posts', batch_size=1, stdout=output)
+        self.post.refresh_from_db()
+        self.assertEquals(self.post.message_html, render('First <b>post</b>'))
+        self.assertIn('Re-rendered 1 of 1 posts.', output.getvalue())
+
+    @override_settings(BOARDS_VIEW_COUNT_FLUSH_INTERVAL=3600)
+    def test_new_markup_version_refreshes_cached_cards(self):
+        url = reverse('boards:topic_posts', kwargs={'board_id': self.post.topic.board_id, 'topic_id': self.post.topic_id})
+        self.client.get(url)
+        Post.objects.filter(pk=self.post.pk).update(message_html='<p>Re-rendered</p>')
+        self.assertNotContains(self.client.get(url), 'Re-rendered')
+        with mock.patch.object(markup, 'MARKUP_VERSION', markup.MARKUP_VERSION + 1):
+            self.assertContains(self.client.get(url), 'Re-rendered')
@@ -0,0 +1,123 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Board, Notification, NotificationJob, Post, Subscription, Topic
+from ..notifications import fan_out, send_digests
+
+
+@override_settings(BOARDS_VIEW_COUNT_FLUSH_INTERVAL=3600, RATELIMIT_ENABLE=False)
+class NotificationTestCase(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(name='Django', description='Django board.')
+        self.users = [
+            User.objects.create_user(username='user{0}'.format(i), email='user{0}@doe.com'.format(i), password='123')
+            for i in range(3)
+        ]
+        self.topic = Topic.objects.create(subject='Hello, world', board=self.board, starter=self.users[0])
+        Post.objects.create(message='Opening post', topic=self.topic, created_by=self.users[0])
+
+    def reply(self, user, message='Reply'):
+        self.client.login(username=user.username, password='123')
+        url = reverse('boards:reply_topic', kwargs={'board_id': self.board.pk, 'topic_id': self.topic.pk})
+        self.client.post(url, {'message': message})
+
+
+class SubscriptionTests(NotificationTestCase):
+    def test_authors_are_subscribed(self):
+        self.reply(self.users[1])
+        self.reply(self.users[1])
+        self.assertEquals(
+            set(Subscription.objects.filter(topic=self.topic).values_list('user__username', flat=True)),
+            {'user0', 'user1'}
+        )
+
+    def test_reply_queues_one_job_whatever_the_subscribers(self):
+        Subscription.objects.bulk_create([
+            Subscription(user=User.objects.create_user(username='follower{0}'.format(i)), topic=self.topic)
+            for i in range(20)
+        ])
+        NotificationJob.objects.all().delete()
+        self.reply(self.users[1])
+        self.assertEquals(NotificationJob.objects.count(), 1)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_follow_and_unfollow(self):
+        self.client.login(username='user2', password='123')
+        url = reverse('boards:topic_subscription', kwargs={'board_id': self.board.pk, 'topic_id': self.topic.pk})
+        posts_url = reverse('boards:topic_posts', kwargs={'board_id': self.board.pk, 'topic_id': self.topic.pk})
+        self.assertContains(self.client.get(posts_url), '>Follow</button>')
+        response = self.client.post(url, {'subscribe': '1'})
+        self.assertRedirects(response, posts_url)
+        self.assertTrue(Subscription.objects.filter(topic=self.topic, user=self.users[2]).exists())
+        self.assertContains(self.client.get(posts_url), '>Unfollow</button>')
+        self.client.post(url)
+        self.assertFalse(Subscription.objects.filter(topic=self.topic, user=self.users[2]).exists())
+
+    def test_subscription_requires_post(self):
+        self.client.login(username='user2', password='123')
+        url = reverse('boards:topic_subscription', kwargs={'board_id': self.board.pk, 'topic_id': self.topic.pk})
+        self.assertEquals(self.client.get(url).status_code, 405)
+
+
+class FanOutTests(NotificationTestCase):
+    def test_notifies_subscribers_but_the_author(self):
+        self.reply(self.users[1])
+        self.reply(self.users[2])
+        self.assertEquals(fan_out(), (3, 3))
+        self.assertFalse(NotificationJob.objects.exists())
+        notified = Notification.objects.order_by('pk').values_list('user__username', 'post__message')
+        self.assertEquals(list(notified), [('user0', 'Reply'), ('user0', 'Reply'), ('user1', 'Reply')])
+
+    def test_query_count_does_not_grow_with_subscribers(self):
+        self.reply(self.users[1])
+        with self.assertNumQueries(6):
+            fan_out()
+        Subscription.objects.bulk_create([
+            Subscription(user=User.objects.create_user(username='follower{0}'.format(i)), topic=self.topic)
+            for i in range(50)
+        ])
+        self.reply(self.users[2])
+        with self.assertNumQueries(6):
+            self.assertEquals(fan_out(), (1, 52))
+
+    def test_command_batches_jobs(self):
+        for _ in range(3):
+            self.reply(self.users[1])
+        output = StringIO()
+        call_command('notify_subscribers', batch_size=2, stdout=output)
+        self.assertIn('Fanned out 4 posts into 3 notifications.', output.getvalue())
+
+
+class DigestTests(NotificationTestCase):
+    def test_one_digest_per_user(self):
+        self.reply(self.users[1], 'First')
+        self.reply(self.users[1], 'Second')
+        self.reply(self.users[2], 'Third')
+        fan_out()
+        self.assertEquals(send_digests(), 2)
+        self.assertEquals(sorted(message.to[0] for message in mail.outbox), ['user0@doe.com', 'user1@doe.com'])
+        body = next(message.body for message in mail.outbox if message.to == ['user0@doe.com'])
+        self.assertIn('Hello, world: 3 new replies', body)
+        self.assertIn(reverse('boards:topic_posts', kwargs={'board_id': self.board.pk, 'topic_id': self.topic.pk}), body)
+        self.assertFalse(Notification.objects.filter(emailed_at__isnull=True).exists())
+        self.assertEquals(send_digests(), 0)
+
+    def test_digest_is_not_html_escaped(self):
+        Topic.objects.filter(pk=self.topic.pk).update(subject='Q&A <b>')
+        self.reply(self.users[1])
+        fan_out()
+        send_digests()
+        self.assertIn('Q&A <b>: 1 new reply', mail.outbox[0].body)
+        self.assertEquals(mail.outbox[0].subject, 'Django Boards: new replies in topics you follow')
+
+    def test_command_sends_digests(self):
+        self.reply(self.users[1])
+        output = StringIO()
+        call_command('notify_subscribers', digests=True, stdout=output)
+        self.assertIn('Sent 1 digests.', output.getvalue())
+        self.assertEquals(mail.outbox[0].subject, 'Django Boards: new replies in topics you follow')
@@ -0,0 +1,94 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Board, Post, Topic
+
+
+class PageCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.board = Board.objects.create(name='Django', description='Django board.')
+        self.user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        self.topic = Topic.objects.create(subject='Hello, world', board=self.board, starter=self.user)
+        Post.objects.create(message='Lorem ipsum dolor sit amet', topic=self.topic, created_by=self.user)
+        self.home_url = reverse('boards:home')
+        self.topics_url = reverse('boards:board_topics', kwargs={'board_id': self.board.pk})
+
+    def reply(self):
+        self.client.login(username='john', password='123')
+        url = reverse('boards:reply_topic', kwargs={'board_id': self.board.pk, 'topic_id': self.topic.pk})
+        self.client.post(url, {'message': 'hello, world!'})
+        self.client.logout()
+
+
+class PageCacheTests(PageCacheTestCase):
+    def test_home_is_cached(self):
+        first = self.client.get(self.home_url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.home_url)
+        self.assertEquals(first.content, second.content)
+
+    def test_board_topics_is_cached(self):
+        self.client.get(self.topics_url)
+        with self.assertNumQueries(0):
+            self.client.get(self.topics_url)
+
+    def test_reply_invalidates(self):
+        self.client.get(self.home_url)
+        self.client.get(self.topics_url)
+        self.reply()
+        self.assertContains(self.client.get(self.home_url), '<td class="align-middle">2</td>')
+        self.assertContains(self.client.get(self.topics_url), '<td>1</td>')
+
+    def test_new_topic_invalidates(self):
+        self.client.get(self.topics_url)
+        Topic.objects.create(subject='Brand new topic', board=self.board, starter=self.user)
+        self.assertContains(self.client.get(self.topics_url), 'Brand new topic')
+
+    def test_other_board_is_not_invalidated(self):
+        other = Board.objects.create(name='Python', description='Python board.')
+        other_url = reverse('boards:board_topics', kwargs={'board_id': other.pk})
+        self.client.get(other_url)
+        self.reply()
+        with self.assertNumQueries(0):
+            self.client.get(other_url)
+
+    def test_authenticated_users_are_not_cached(self):
+        self.client.login(username='john', password='123')
+        self.client.get(self.home_url)
+        response = self.client.get(self.home_url)
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, 'john')
+
+
+class FileBasedPageCacheTests(PageCacheTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_dir = tempfile.mkdtemp()
+        cls.cache_settings = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': cls.cache_dir,
+        }})
+        cls.cache_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.cache_settings.disable()
+        shutil.rmtree(cls.cache_dir)
+
+    def test_home_is_cached(self):
+        self.client.get(self.home_url)
+        with self.assertNumQueries(0):
+            self.client.get(self.home_url)
+
+    def test_reply_invalidates(self):
+        self.client.get(self.home_url)
+        self.reply()
+        self.assertContains(self.client.get(self.home_url), '<td class="align-middle">2</td>')
@@ -0,0 +1,73 @@
+from django.contrib.auth.models import AnonymousUser, User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Board, Post, ReadMarker, Topic
+from ..readmarkers import mark_read
+
+
+@override_settings(BOARDS_VIEW_COUNT_FLUSH_INTERVAL=3600, BOARDS_POSTS_PER_PAGE=2)
+class ReadMarkerTests(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(name='Django', description='Django board.')
+        self.user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        self.topics = [
+            Topic.objects.create(subject='Topic {0}'.format(i), board=self.board, starter=self.user) for i in range(3)
+        ]
+        self.posts = [
+            Post.objects.create(message='Post {0}'.format(i), topic=self.topics[0], created_by=self.user)
+            for i in range(3)
+        ]
+        Post.objects.create(message='Other', topic=self.topics[1], created_by=self.user)
+        self.client.login(username='john', password='123')
+
+    def marker(self, topic):
+        return ReadMarker.objects.get(user=self.user, topic=topic).last_read_post_id
+
+    def unread(self):
+        topics = Topic.objects.filter(board=self.board).with_unread(self.user).order_by('pk')
+        return [topic.unread for topic in topics]
+
+    def test_viewing_posts_moves_the_marker(self):
+        url = reverse('boards:topic_posts', kwargs={'board_id': self.board.pk, 'topic_id': self.topics[0].pk})
+        response = self.client.get(url)
+        self.assertEquals(self.marker(self.topics[0]), self.posts[1].pk)
+        self.client.get(reverse('boards:topic_posts_page', kwargs={
+            'board_id': self.board.pk, 'topic_id': self.topics[0].pk, 'cursor': response.context['posts'].next_cursor,
+        }))
+        self.assertEquals(self.marker(self.topics[0]), self.posts[2].pk)
+
+    def test_marker_never_moves_backwards(self):
+        mark_read(self.user, self.topics[0].pk, self.posts[2].pk)
+        mark_read(self.user, self.topics[0].pk, self.posts[0].pk)
+        self.assertEquals(self.marker(self.topics[0]), self.posts[2].pk)
+        self.assertEquals(ReadMarker.objects.count(), 1)
+
+    def test_upsert_is_one_query_once_the_marker_exists(self):
+        mark_read(self.user, self.topics[0].pk, self.posts[0].pk)
+        with self.assertNumQueries(1):
+            mark_read(self.user, self.topics[0].pk, self.posts[1].pk)
+
+    def test_anonymous_users_have_no_markers(self):
+        mark_read(AnonymousUser(), self.topics[0].pk, self.posts[0].pk)
+        self.assertFalse(ReadMarker.objects.exists())
+        self.assertFalse(hasattr(Topic.objects.with_unread(AnonymousUser()).first(), 'unread'))
+
+    def test_unread_state(self):
+        # Never opened, topics without posts are not unread.
+        self.assertEquals(self.unread(), [True, True, False])
+        mark_read(self.user, self.topics[0].pk, self.posts[2].pk)
+        self.assertEquals(self.unread(), [False, True, False])
+        Post.objects.create(message='New', topic=self.topics[0], created_by=self.user)
+        self.assertEquals(self.unread(), [True, True, False])
+
+    def test_board_topics_shows_unread_in_one_query(self):
+        mark_read(self.user, self.topics[1].pk, Post.objects.filter(topic=self.topics[1]).get().pk)
+        url = reverse('boards:board_topics', kwargs={'board_id': self.board.pk})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertContains(response, '>New</span>', count=1)
+        topic_queries = [query for query in context.captured_queries if 'FROM "boards_topic"' in query['sql']]
+        self.assertEquals(len(topic_queries), 1)
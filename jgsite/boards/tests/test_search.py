@@ -0,0 +1,134 @@
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+
+from .. import search
+from ..models import Board, Post, Topic
+from ..search import FTS5Backend
+from ..views import search as search_view
+
+
+class SearchTestCase(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(name='Django', description='Django board.')
+        self.user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        self.orm = self.new_topic('Django ORM tips', 'How do I use select_related with the ORM?')
+        self.reply(self.orm, 'select_related follows foreign keys in one query.')
+        self.templates = self.new_topic('Template caching', 'The cache tag stores rendered fragments.')
+
+    def new_topic(self, subject, message):
+        topic = Topic.objects.create(subject=subject, board=self.board, starter=self.user)
+        self.reply(topic, message)
+        return topic
+
+    def reply(self, topic, message):
+        return Post.objects.create(message=message, topic=topic, created_by=self.user)
+
+    def search_topics(self, query):
+        post_ids, total = search.search(query)
+        posts = Post.objects.in_bulk(post_ids)
+        return [posts[pk].topic.subject for pk in post_ids], total
+
+
+class SearchBackendTests:
+    def test_search_message(self):
+        self.assertEquals(self.search_topics('fragments'), (['Template caching'], 1))
+
+    def test_search_subject(self):
+        self.assertEquals(self.search_topics('tips'), (['Django ORM tips'], 1))
+
+    def test_all_words_must_match(self):
+        self.assertEquals(self.search_topics('select_related query'), (['Django ORM tips'], 1))
+        self.assertEquals(self.search_topics('select_related fragments'), ([], 0))
+
+    def test_ranking(self):
+        # The opening post mentions the ORM in both subject and message
+        self.reply(self.templates, 'Nothing to do with the orm.')
+        subjects, total = self.search_topics('orm')
+        self.assertEquals(total, 2)
+        self.assertEquals(subjects[0], 'Django ORM tips')
+
+    def test_edit_updates_index(self):
+        post = self.templates.posts.get()
+        post.message = 'Rewritten entirely.'
+        post.save()
+        self.assertEquals(self.search_topics('fragments'), ([], 0))
+        self.assertEquals(self.search_topics('rewritten'), (['Template caching'], 1))
+
+    def test_subject_edit_updates_index(self):
+        self.templates.subject = 'Fragment caching'
+        self.templates.save()
+        self.assertEquals(self.search_topics('template'), ([], 0))
+
+    def test_delete_updates_index(self):
+        self.templates.delete()
+        self.assertEquals(self.search_topics('fragments'), ([], 0))
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEquals(self.search_topics('"fragments" OR NEAR('), ([], 0))
+        self.assertEquals(self.search_topics('   '), ([], 0))
+
+    def test_pagination(self):
+        for i in range(5):
+            self.reply(self.orm, 'Another orm reply.')
+        post_ids, total = search.search('orm', offset=0, limit=4)
+        more_ids, _ = search.search('orm', offset=4, limit=4)
+        self.assertEquals(total, 6)
+        self.assertEquals(len(post_ids), 4)
+        self.assertEquals(len(more_ids), 2)
+        self.assertFalse(set(post_ids) & set(more_ids))
+
+    def test_rebuild_command(self):
+        search.get_backend().clear()
+        self.assertEquals(self.search_topics('fragments'), ([], 0))
+        call_command('rebuild_search_index', batch_size=2, stdout=StringIO())
+        self.assertEquals(self.search_topics('fragments'), (['Template caching'], 1))
+        self.assertEquals(self.search_topics('tips'), (['Django ORM tips'], 1))
+
+
+@override_settings(BOARDS_SEARCH_BACKEND='boards.search.FTS5Backend')
+class FTS5BackendTests(SearchBackendTests, SearchTestCase):
+    def setUp(self):
+        if not FTS5Backend.is_available():
+            self.skipTest('SQLite FTS5 is not available')
+        super().setUp()
+
+
+@override_settings(BOARDS_SEARCH_BACKEND='boards.search.InvertedIndexBackend')
+class InvertedIndexBackendTests(SearchBackendTests, SearchTestCase):
+    pass
+
+
+class SearchViewTests(SearchTestCase):
+    def test_view_function(self):
+        view = resolve('/boards/search/')
+        self.assertEquals(view.func, search_view)
+
+    def test_results(self):
+        response = self.client.get(reverse('boards:search'), {'q': 'fragments'})
+        topic_url = reverse('boards:topic_posts', kwargs={'board_id': self.board.pk, 'topic_id': self.templates.pk})
+        self.assertEquals(response.status_code, 200)
+        self.assertContains(response, 'href="{0}"'.format(topic_url))
+        self.assertContains(response, '1 result for')
+
+    @override_settings(BOARDS_SEARCH_RESULTS_PER_PAGE=1)
+    def test_pagination_links(self):
+        response = self.client.get(reverse('boards:search'), {'q': 'select_related', 'page': 'x'})
+        self.assertEquals(len(response.context['results']), 1)
+        self.assertContains(response, 'page=2')
+
+    @override_settings(BOARDS_SEARCH_RESULTS_PER_PAGE=1)
+    def test_page_past_the_end(self):
+        for page in ('3', '99999999999999999999'):
+            response = self.client.get(reverse('boards:search'), {'q': 'select_related', 'page': page})
+            self.assertEquals(response.status_code, 200)
+            self.assertEquals(response.context['page'], 2)
+            self.assertEquals(len(response.context['results']), 1)
+            self.assertFalse(response.context['has_next'])
+
+    def test_empty_query(self):
+        response = self.client.get(reverse('boards:search'))
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(response.context['results'], [])
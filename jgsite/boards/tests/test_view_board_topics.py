@@ -1,7 +1,11 @@
+import base64
+
+from django.contrib.auth.models import User
 from django.urls import resolve, reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from ..views import board_topics
-from ..models import Board
+from ..models import Board, Topic
 
 class BoardTopicsTests(TestCase):
     def setUp(self):
@@ -34,3 +38,58 @@ class BoardTopicsTests(TestCase):
         response = self.client.get(board_topics_url)
         self.assertContains(response, 'href="{0}"'.format(homepage_url))
         self.assertContains(response, 'href="{0}"'.format(new_topic_url))               
+
+
+@override_settings(BOARDS_TOPICS_PER_PAGE=3)
+class BoardTopicsPaginationTests(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(name='Django', description='Django board.')
+        user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        for i in range(7):
+            Topic.objects.create(subject='Topic {0}'.format(i), board=self.board, starter=user)
+        # Ties on last_updated must be broken by id
+        Topic.objects.update(last_updated=timezone.now())
+        self.url = reverse('boards:board_topics', kwargs={'board_id': self.board.pk})
+
+    def get_page(self, cursor):
+        url = reverse('boards:board_topics_page', kwargs={'board_id': self.board.pk, 'cursor': cursor})
+        return self.client.get(url).context['topics']
+
+    def test_walk_forwards_and_backwards(self):
+        expected = list(Topic.objects.order_by('-last_updated', '-pk'))
+        first = self.client.get(self.url).context['topics']
+        self.assertFalse(first.has_previous)
+        second = self.get_page(first.next_cursor)
+        third = self.get_page(second.next_cursor)
+        self.assertEquals(list(first) + list(second) + list(third), expected)
+        self.assertFalse(third.has_next)
+        self.assertEquals(list(self.get_page(third.previous_cursor)), list(second))
+        back_to_first = self.get_page(second.previous_cursor)
+        self.assertEquals(list(back_to_first), list(first))
+        self.assertFalse(back_to_first.has_previous)
+
+    def test_page_links(self):
+        response = self.client.get(self.url)
+        next_url = reverse('boards:board_topics_page', kwargs={
+            'board_id': self.board.pk, 'cursor': response.context['topics'].next_cursor
+        })
+        self.assertContains(response, 'href="{0}"'.format(next_url))
+
+    def test_invalid_cursor(self):
+        url = reverse('boards:board_topics_page', kwargs={'board_id': self.board.pk, 'cursor': 'nbogus'})
+        response = self.client.get(url)
+        self.assertEquals(response.status_code, 404)
+
+    def hand_made_cursor(self, key):
+        return base64.urlsafe_b64encode(key.encode()).decode().rstrip('=')
+
+    def test_cursor_past_the_end(self):
+        for cursor in ('n' + self.hand_made_cursor('2020-01-01T00:00:00|5'),
+                       'p' + self.hand_made_cursor('9999-12-31T23:59:59+14:00|1')):
+            url = reverse('boards:board_topics_page', kwargs={'board_id': self.board.pk, 'cursor': cursor})
+            self.assertEquals(self.client.get(url).status_code, 404)
+
+    def test_cursor_pk_out_of_range(self):
+        cursor = 'n' + self.hand_made_cursor('2020-01-01T00:00:00+00:00|{0}'.format(10 ** 30))
+        url = reverse('boards:board_topics_page', kwargs={'board_id': self.board.pk, 'cursor': cursor})
+        self.assertEquals(self.client.get(url).status_code, 404)
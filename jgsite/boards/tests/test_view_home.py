@@ -1,7 +1,10 @@
+from django.contrib.auth.models import User
+from django.db import connection
 from django.urls import resolve, reverse
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from ..views import home
-from ..models import Board
+from ..models import Board, Post, Topic
 
 class HomeTests(TestCase):
     def setUp(self):
@@ -20,3 +23,43 @@ class HomeTests(TestCase):
         board_topics_url = reverse('boards:board_topics', kwargs={'board_id': self.board.pk})
         self.assertContains(self.response, 'href="{0}"'.format(board_topics_url))        
         
+
+
+class HomeBoardStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        self.url = reverse('boards:home')
+
+    def create_board(self, name, topics=2, posts_per_topic=3):
+        board = Board.objects.create(name=name, description='{0} board.'.format(name))
+        for i in range(topics):
+            topic = Topic.objects.create(subject='Topic {0}'.format(i), board=board, starter=self.user)
+            for j in range(posts_per_topic):
+                Post.objects.create(message='Post {0}'.format(j), topic=topic, created_by=self.user)
+        return board
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url)
+        return len(context)
+
+    def test_board_stats(self):
+        self.create_board('Django')
+        Board.objects.create(name='Empty', description='Empty board.')
+        response = self.client.get(self.url)
+        django, empty = response.context['boards']
+        self.assertEquals(django.posts_count, 6)
+        self.assertEquals(django.topics_count, 2)
+        self.assertEquals(django.last_post, Post.objects.latest('created_at'))
+        self.assertEquals(django.last_post.created_by.username, 'john')
+        self.assertEquals(empty.posts_count, 0)
+        self.assertEquals(empty.topics_count, 0)
+        self.assertIsNone(empty.last_post)
+        self.assertContains(response, 'No posts yet.')
+
+    def test_query_count_does_not_grow_with_boards(self):
+        self.create_board('Django')
+        queries_with_one_board = self.count_queries()
+        for name in ('Python', 'Random', 'Off-topic', 'Meta'):
+            self.create_board(name)
+        self.assertEquals(self.count_queries(), queries_with_one_board)
@@ -1,10 +1,11 @@
 from django.contrib.auth.models import User
 from django.urls import resolve, reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from ..views import new_topic
 from ..models import Board, Topic, Post
 from ..forms import NewTopicForm
 
+@override_settings(RATELIMIT_ENABLE=False)
 class NewTopicTests(TestCase):
     def setUp(self):
         Board.objects.create(name='Django', description='Django board.')
@@ -1,5 +1,5 @@
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import resolve, reverse
 
 from ..forms import PostForm
@@ -7,6 +7,7 @@ from ..models import Board, Post, Topic
 from ..views import reply_topic
 
 
+@override_settings(RATELIMIT_ENABLE=False)
 class ReplyTopicTestCase(TestCase):
     '''
     Base test case to be used in all `reply_topic` view tests
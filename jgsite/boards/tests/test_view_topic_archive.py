@@ -0,0 +1,49 @@
+from django.contrib.auth.models import User
+from django.http import StreamingHttpResponse
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+
+from ..models import Board, Post, Topic
+from ..views import topic_archive
+
+
+@override_settings(BOARDS_ARCHIVE_CHUNK_SIZE=2, BOARDS_VIEW_COUNT_FLUSH_INTERVAL=3600)
+class TopicArchiveTests(TestCase):
+    def setUp(self):
+        board = Board.objects.create(name='Django', description='Django board.')
+        user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        self.topic = Topic.objects.create(subject='Hello, world', board=board, starter=user)
+        for i in range(5):
+            Post.objects.create(message='Post {0}'.format(i), topic=self.topic, created_by=user)
+        self.url = reverse('boards:topic_archive', kwargs={'board_id': board.pk, 'topic_id': self.topic.pk})
+
+    def get_content(self):
+        response = self.client.get(self.url)
+        self.assertEquals(response.status_code, 200)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b''.join(response.streaming_content).decode()
+
+    def test_view_function(self):
+        view = resolve('/boards/1/topic/1/archive/')
+        self.assertEquals(view.func, topic_archive)
+
+    def test_not_found(self):
+        url = reverse('boards:topic_archive', kwargs={'board_id': self.topic.board.pk, 'topic_id': 99})
+        self.assertEquals(self.client.get(url).status_code, 404)
+
+    def test_all_posts_in_order(self):
+        content = self.get_content()
+        positions = [content.index('Post {0}'.format(i)) for i in range(5)]
+        self.assertEquals(positions, sorted(positions))
+        self.assertTrue(content.rstrip().endswith('</html>'))
+
+    def test_subject_header_once(self):
+        content = self.get_content()
+        self.assertEquals(content.count('class="card-header'), 1)
+
+    def test_queries_per_chunk(self):
+        # One SELECT read through a cursor; the authors' post counts come
+        # joined from their profiles.
+        response = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            b''.join(response.streaming_content)
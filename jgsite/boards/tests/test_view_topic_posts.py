@@ -1,6 +1,10 @@
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import resolve, reverse
+from django.utils import timezone
 
 from ..models import Board, Post, Topic
 from ..views import topic_posts
@@ -20,4 +24,118 @@ class TopicPostsTests(TestCase):
 
     def test_view_function(self):
         view = resolve('/boards/1/topic/1/posts/')
-        self.assertEquals(view.func, topic_posts)
\ No newline at end of file
+        self.assertEquals(view.func, topic_posts)
+
+
+@override_settings(BOARDS_POSTS_PER_PAGE=2)
+class TopicPostsPaginationTests(TestCase):
+    def setUp(self):
+        board = Board.objects.create(name='Django', description='Django board.')
+        user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        self.topic = Topic.objects.create(subject='Hello, world', board=board, starter=user)
+        for i in range(5):
+            Post.objects.create(message='Post {0}'.format(i), topic=self.topic, created_by=user)
+        self.kwargs = {'board_id': board.pk, 'topic_id': self.topic.pk}
+
+    def get_page(self, cursor=None):
+        if cursor is None:
+            url = reverse('boards:topic_posts', kwargs=self.kwargs)
+        else:
+            url = reverse('boards:topic_posts_page', kwargs=dict(self.kwargs, cursor=cursor))
+        response = self.client.get(url)
+        return response, response.context['posts']
+
+    def test_oldest_posts_first(self):
+        response, posts = self.get_page()
+        self.assertEquals([post.message for post in posts], ['Post 0', 'Post 1'])
+        self.assertContains(response, 'class="card-header')
+
+    def test_next_page(self):
+        _, first = self.get_page()
+        response, second = self.get_page(first.next_cursor)
+        self.assertEquals([post.message for post in second], ['Post 2', 'Post 3'])
+        self.assertTrue(second.has_previous)
+        self.assertNotContains(response, 'class="card-header')
+
+    def test_last_page(self):
+        _, first = self.get_page()
+        _, second = self.get_page(first.next_cursor)
+        _, third = self.get_page(second.next_cursor)
+        self.assertEquals([post.message for post in third], ['Post 4'])
+        self.assertFalse(third.has_next)
+
+    def test_stale_next_link(self):
+        _, first = self.get_page()
+        _, second = self.get_page(first.next_cursor)
+        _, third = self.get_page(second.next_cursor)
+        cursor = second.next_cursor
+        Post.objects.filter(pk__in=[post.pk for post in third]).delete()
+        url = reverse('boards:topic_posts_page', kwargs=dict(self.kwargs, cursor=cursor))
+        self.assertEquals(self.client.get(url).status_code, 404)
+
+
+@override_settings(BOARDS_VIEW_COUNT_FLUSH_INTERVAL=3600)
+class TopicPostsQueryCountTests(TestCase):
+    def setUp(self):
+        board = Board.objects.create(name='Django', description='Django board.')
+        self.users = [
+            User.objects.create_user(username='user{0}'.format(i), email='user{0}@doe.com'.format(i), password='123')
+            for i in range(10)
+        ]
+        self.topic = Topic.objects.create(subject='Hello, world', board=board, starter=self.users[0])
+        self.url = reverse('boards:topic_posts', kwargs={'board_id': board.pk, 'topic_id': self.topic.pk})
+
+    def add_posts(self, count, authors):
+        for i in range(count):
+            Post.objects.create(message='Post {0}'.format(i), topic=self.topic, created_by=authors[i % len(authors)])
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        return response, len(context)
+
+    def test_author_posts_count(self):
+        self.add_posts(3, self.users[:2])
+        Post.objects.create(message='Elsewhere', topic=Topic.objects.create(
+            subject='Other', board=self.topic.board, starter=self.users[0]
+        ), created_by=self.users[0])
+        response, _ = self.count_queries()
+        counts = {post.created_by.username: post.created_by.profile.posts_count for post in response.context['posts']}
+        self.assertEquals(counts, {'user0': 3, 'user1': 1})
+
+    def test_query_count_does_not_grow_with_posts_or_authors(self):
+        self.add_posts(2, self.users[:1])
+        _, queries_for_small_page = self.count_queries()
+        self.add_posts(18, self.users)
+        _, queries_for_full_page = self.count_queries()
+        self.assertEquals(queries_for_full_page, queries_for_small_page)
+
+
+@override_settings(BOARDS_VIEW_COUNT_FLUSH_INTERVAL=3600)
+class TopicPostsFragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        board = Board.objects.create(name='Django', description='Django board.')
+        self.user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        topic = Topic.objects.create(subject='Hello, world', board=board, starter=self.user)
+        self.post = Post.objects.create(message='Lorem ipsum dolor sit amet', topic=topic, created_by=self.user)
+        self.url = reverse('boards:topic_posts', kwargs={'board_id': board.pk, 'topic_id': topic.pk})
+        self.edit_url = reverse('boards:edit_topic', kwargs={'board_id': board.pk, 'topic_id': topic.pk})
+        self.client.get(self.url)
+
+    def test_fragment_is_cached(self):
+        Post.objects.filter(pk=self.post.pk).update(message='Changed behind the cache')
+        self.assertContains(self.client.get(self.url), 'Lorem ipsum dolor sit amet')
+
+    def test_edit_invalidates_fragment(self):
+        Post.objects.filter(pk=self.post.pk).update(
+            message='Edited message', message_html='<p>Edited message</p>', updated_at=timezone.now()
+        )
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Edited message')
+        self.assertNotContains(response, 'Lorem ipsum dolor sit amet')
+
+    def test_edit_button_renders_per_viewer(self):
+        self.assertNotContains(self.client.get(self.url), 'href="{0}"'.format(self.edit_url))
+        self.client.login(username='john', password='123')
+        self.assertContains(self.client.get(self.url), 'href="{0}"'.format(self.edit_url))
@@ -0,0 +1,84 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Board, Topic
+from ..viewcounts import FileViewCountStore, MemoryViewCountStore, flush_views, get_store
+
+
+class ViewCountTestCase(TestCase):
+    def setUp(self):
+        board = Board.objects.create(name='Django', description='Django board.')
+        user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+        self.topic = Topic.objects.create(subject='Hello, world', board=board, starter=user)
+        self.other = Topic.objects.create(subject='Other', board=board, starter=user)
+        self.url = reverse('boards:topic_posts', kwargs={'board_id': board.pk, 'topic_id': self.topic.pk})
+        get_store().drain()
+
+
+class MemoryViewCountStoreTests(TestCase):
+    def test_drain(self):
+        store = MemoryViewCountStore()
+        store.add(1)
+        store.add(1)
+        store.add(2, 5)
+        self.assertEquals(store.drain(), {1: 2, 2: 5})
+        self.assertEquals(store.drain(), {})
+
+
+class FileViewCountStoreTests(TestCase):
+    def test_drain(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = FileViewCountStore(os.path.join(directory, 'views.spool'))
+            self.assertEquals(store.drain(), {})
+            store.add(1)
+            store.add(1)
+            store.add(2, 5)
+            self.assertEquals(store.drain(), {1: 2, 2: 5})
+            self.assertEquals(store.drain(), {})
+            self.assertEquals(os.listdir(directory), [])
+
+
+@override_settings(BOARDS_VIEW_COUNT_FLUSH_INTERVAL=3600)
+class BufferedViewCountTests(ViewCountTestCase):
+    def test_views_are_buffered(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.topic.refresh_from_db()
+        self.assertEquals(self.topic.views, 0)
+        self.assertEquals(flush_views(), 2)
+        self.topic.refresh_from_db()
+        self.assertEquals(self.topic.views, 2)
+
+    def test_flush_does_not_touch_other_columns(self):
+        self.client.get(self.url)
+        Topic.objects.filter(pk=self.topic.pk).update(subject='Renamed', views=10)
+        flush_views()
+        self.topic.refresh_from_db()
+        self.assertEquals(self.topic.subject, 'Renamed')
+        self.assertEquals(self.topic.views, 11)
+
+    def test_flush_multiple_topics(self):
+        get_store().add(self.topic.pk, 3)
+        get_store().add(self.other.pk, 3)
+        flush_views()
+        self.assertEquals(list(Topic.objects.order_by('pk').values_list('views', flat=True)), [3, 3])
+
+    def test_flush_command(self):
+        self.client.get(self.url)
+        call_command('flush_view_counts', stdout=StringIO())
+        self.topic.refresh_from_db()
+        self.assertEquals(self.topic.views, 1)
+
+
+@override_settings(BOARDS_VIEW_COUNT_FLUSH_INTERVAL=0)
+class UnbufferedViewCountTests(ViewCountTestCase):
+    def test_views_are_flushed_immediately(self):
+        self.client.get(self.url)
+        self.topic.refresh_from_db()
+        self.assertEquals(self.topic.views, 1)
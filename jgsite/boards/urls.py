@@ -1,14 +1,39 @@
-from django.urls import path
+from django.urls import path, register_converter
 
-from . import views
+from . import api, async_views, views
+from .pagination import CursorConverter
+
+register_converter(CursorConverter, 'cursor')
 
 app_name = 'boards'
 urlpatterns = [
     path('', views.home, name='home'),
+    path('search/', views.search, name='search'),
+    path('stats/requests/', views.request_stats, name='request_stats'),
     path('<int:board_id>/topics/', views.board_topics, name='board_topics'),
+    path('<int:board_id>/topics/page/<cursor:cursor>/', views.board_topics, name='board_topics_page'),
+    path('<int:board_id>/topics/archived/', views.archived_topics, name='archived_topics'),
+    path('<int:board_id>/topics/archived/page/<cursor:cursor>/', views.archived_topics, name='archived_topics_page'),
     path('<int:board_id>/topics/new/', views.new_topic, name='new_topic'),
     path('<int:board_id>/topic/<int:topic_id>/edit/', views.edit_topic, name='edit_topic'),
     path('<int:board_id>/topic/<int:topic_id>/posts/', views.topic_posts, name='topic_posts'),
+    path('<int:board_id>/topic/<int:topic_id>/posts/page/<cursor:cursor>/', views.topic_posts, name='topic_posts_page'),
+    path('<int:board_id>/topic/<int:topic_id>/archive/', views.topic_archive, name='topic_archive'),
     path('<int:board_id>/topic/<int:topic_id>/reply/', views.reply_topic, name='reply_topic'),
+    path('<int:board_id>/topic/<int:topic_id>/subscription/', views.topic_subscription, name='topic_subscription'),
+    path('api/', api.boards, name='api_boards'),
+    path('api/<int:board_id>/topics/', api.board_topics, name='api_board_topics'),
+    path('api/<int:board_id>/topics/page/<cursor:cursor>/', api.board_topics, name='api_board_topics_page'),
+    path('api/<int:board_id>/topic/<int:topic_id>/posts/', api.topic_posts, name='api_topic_posts'),
+    path('api/<int:board_id>/topic/<int:topic_id>/posts/page/<cursor:cursor>/', api.topic_posts, name='api_topic_posts_page'),
     
-]
\ No newline at end of file
+]
+
+if async_views.ASYNC_VIEWS:
+    urlpatterns += [
+        path('async/', async_views.home, name='async_home'),
+        path('async/<int:board_id>/topics/', async_views.board_topics, name='async_board_topics'),
+        path('async/<int:board_id>/topics/page/<cursor:cursor>/', async_views.board_topics, name='async_board_topics_page'),
+        path('async/<int:board_id>/topic/<int:topic_id>/posts/', async_views.topic_posts, name='async_topic_posts'),
+        path('async/<int:board_id>/topic/<int:topic_id>/posts/page/<cursor:cursor>/', async_views.topic_posts, name='async_topic_posts_page'),
+    ]
@@ -1,12 +1,31 @@
-from django.db.models import Count
+import math
+import sys
+import uuid
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template import loader
+from django.template.loader import render_to_string
 from django.views.generic import UpdateView, View
 from django.utils import timezone
 from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_POST
+
+from jgsite.ratelimit import ratelimit
 
+from .cache import INDEX, board_scope, versioned_cache_page
+from . import instrumentation
 from .forms import NewTopicForm, EditTopicForm, PostForm
-from .models import Board, Post, Topic
+from .models import ArchivedTopic, Board, Post, Subscription, Topic
+from .notifications import subscribe
+from .pagination import InvalidCursor, KeysetPage, KeysetPaginator
+from .readmarkers import mark_read
+from .search import search as search_posts
+from .viewcounts import record_view
 # 
 # 
 # from django.contrib.auth.models import User
@@ -17,16 +36,68 @@ from .models import Board, Post, Topic
 # from .forms import NewTopicForm, EditTopicForm, PostForm
 # from .models import Board, Topic, Post
 
+@versioned_cache_page(lambda **kwargs: [INDEX])
 def home(request):
-    boards = Board.objects.all()
+    boards = Board.objects.with_stats().order_by('pk')
     return render(request, 'boards/home.html', {'boards': boards})
 
-def board_topics(request, board_id):
+def get_page(queryset, field, per_page, cursor, descending=False):
+    paginator = KeysetPaginator(queryset, field, per_page, descending=descending)
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor:
+        raise Http404('Invalid page cursor.')
+
+@versioned_cache_page(lambda board_id, **kwargs: [board_scope(board_id)])
+def board_topics(request, board_id, cursor=None):
     board = get_object_or_404(Board, pk=board_id)
-    topics = board.topics.order_by('-last_updated').annotate(replies=Count('posts') - 1)
+    per_page = getattr(settings, 'BOARDS_TOPICS_PER_PAGE', 20)
+    topics = board.topics.select_related('starter').with_unread(request.user)
+    topics = get_page(topics, 'last_updated', per_page, cursor, descending=True)
     return render(request, 'boards/topics.html', {'board': board, 'topics': topics})
 
+@versioned_cache_page(lambda board_id, **kwargs: [board_scope(board_id)])
+def archived_topics(request, board_id, cursor=None):
+    board = get_object_or_404(Board, pk=board_id)
+    per_page = getattr(settings, 'BOARDS_TOPICS_PER_PAGE', 20)
+    topics = get_page(board.archived_topics.select_related('starter'), 'last_updated', per_page, cursor, descending=True)
+    return render(request, 'boards/topics.html', {'board': board, 'topics': topics, 'archived': True})
+
+@staff_member_required
+def request_stats(request):
+    return JsonResponse({
+        'sample_rate': getattr(settings, 'BOARDS_INSTRUMENTATION_SAMPLE_RATE', instrumentation.DEFAULT_SAMPLE_RATE),
+        'views': instrumentation.summary(),
+    })
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    per_page = getattr(settings, 'BOARDS_SEARCH_RESULTS_PER_PAGE', 20)
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    # Keep the offset within what the database takes, and show the last
+    # page for pages past it.
+    page = min(page, sys.maxsize // per_page)
+    post_ids, total = search_posts(query, offset=(page - 1) * per_page, limit=per_page)
+    last_page = max(math.ceil(total / per_page), 1)
+    if page > last_page:
+        page = last_page
+        post_ids, total = search_posts(query, offset=(page - 1) * per_page, limit=per_page)
+    posts = Post.objects.select_related('topic__board', 'created_by').in_bulk(post_ids)
+    results = [posts[pk] for pk in post_ids if pk in posts]
+    return render(request, 'boards/search.html', {
+        'query': query,
+        'results': results,
+        'total': total,
+        'page': page,
+        'has_previous': page > 1,
+        'has_next': page * per_page < total,
+    })
+
 @login_required
+@ratelimit('new_topic', user='5/m', ip='20/m')
 def new_topic(request, board_id):
     board = get_object_or_404(Board, pk=board_id)
     if request.method == 'POST':
@@ -46,11 +117,77 @@ def new_topic(request, board_id):
         form = NewTopicForm()
     return render(request, 'boards/new_topic.html', {'board': board, 'form': form})
 
-def topic_posts(request, board_id, topic_id):
+def get_topic(board_id, topic_id):
+    '''
+    Return the topic, from the archive if it was archived, and whether it
+    was. Archived topics are read-only and keep no view counts or read
+    markers.
+    '''
+    try:
+        return Topic.objects.select_related('board').get(board__pk=board_id, pk=topic_id), False
+    except Topic.DoesNotExist:
+        topics = ArchivedTopic.objects.select_related('board')
+        return get_object_or_404(topics, board__pk=board_id, pk=topic_id), True
+
+def topic_posts(request, board_id, topic_id, cursor=None):
+    topic, archived = get_topic(board_id, topic_id)
+    if not archived:
+        record_view(topic.pk)
+    per_page = getattr(settings, 'BOARDS_POSTS_PER_PAGE', 20)
+    posts = get_page(topic.posts.select_related('created_by__profile'), 'created_at', per_page, cursor)
+    if posts and not archived:
+        mark_read(request.user, topic.pk, max(post.pk for post in posts))
+    subscribed = (
+        not archived and request.user.is_authenticated
+        and Subscription.objects.filter(topic=topic, user=request.user).exists()
+    )
+    return render(request, 'boards/topic_posts.html', {
+        'topic': topic, 'posts': posts, 'subscribed': subscribed, 'archived': archived,
+    })
+
+@login_required
+@require_POST
+def topic_subscription(request, board_id, topic_id):
     topic = get_object_or_404(Topic, board__pk=board_id, pk=topic_id)
-    topic.views += 1
-    topic.save()    
-    return render(request, 'boards/topic_posts.html', {'topic': topic})
+    if request.POST.get('subscribe'):
+        subscribe(request.user.pk, topic.pk)
+    else:
+        Subscription.objects.filter(topic=topic, user=request.user).delete()
+    return redirect('boards:topic_posts', board_id=board_id, topic_id=topic_id)
+
+def topic_archive(request, board_id, topic_id):
+    '''
+    The whole topic on one page, as a streamed response. The page around
+    the posts is rendered once and split at a marker, then the posts are
+    read through a server-side cursor and rendered a chunk at a time, so
+    memory use and time to first byte do not grow with the thread.
+    '''
+    topic, archived = get_topic(board_id, topic_id)
+    if not archived:
+        record_view(topic.pk)
+    marker = uuid.uuid4().hex
+    head, tail = render_to_string(
+        'boards/topic_archive.html', {'topic': topic, 'posts_marker': marker, 'archived': archived}, request
+    ).split(marker)
+    chunk_size = getattr(settings, 'BOARDS_ARCHIVE_CHUNK_SIZE', 100)
+    posts = topic.posts.select_related('created_by__profile').order_by('created_at', 'pk').iterator(chunk_size=chunk_size)
+    template = loader.get_template('boards/includes/post_list.html')
+
+    def stream():
+        yield head
+        has_previous = False
+        while True:
+            chunk = list(islice(posts, chunk_size))
+            if not chunk:
+                break
+            if not archived:
+                mark_read(request.user, topic.pk, max(post.pk for post in chunk))
+            page = KeysetPage(chunk, False, has_previous, 'created_at')
+            yield template.render({'topic': topic, 'posts': page, 'user': request.user, 'archived': archived})
+            has_previous = True
+        yield tail
+
+    return StreamingHttpResponse(stream())
 
 @login_required
 def edit_topic(request, board_id, topic_id):
@@ -66,6 +203,7 @@ def edit_topic(request, board_id, topic_id):
     return render(request, 'boards/edit_topic.html', {'topic': topic, 'form': form})
 
 @login_required
+@ratelimit('reply_topic', user='10/m', ip='30/m')
 def reply_topic(request, board_id, topic_id):
     topic = get_object_or_404(Topic, board__pk=board_id, pk=topic_id)
     if request.method == 'POST':
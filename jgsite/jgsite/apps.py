@@ -0,0 +1,11 @@
+from django.contrib.staticfiles.apps import StaticFilesConfig as BaseStaticFilesConfig
+
+
+class StaticFilesConfig(BaseStaticFilesConfig):
+    # Leave scratch directories and the unminified bootstrap sources,
+    # which no template loads, out of collectstatic.
+    ignore_patterns = BaseStaticFilesConfig.ignore_patterns + [
+        'junk', 'save',
+        'bootstrap.css', 'bootstrap-grid.css', 'bootstrap-reboot.css',
+        'bootstrap.js', 'bootstrap.bundle.js',
+    ]
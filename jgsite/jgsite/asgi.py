@@ -0,0 +1,25 @@
+"""
+ASGI config for jgsite project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+The async read views in boards.async_views need Django 3.1 or later. Older
+versions have no ASGI handler, so the WSGI application is wrapped with
+asgiref and every view runs in a thread.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
+"""
+
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jgsite.settings')
+
+try:
+    from django.core.asgi import get_asgi_application
+except ImportError:
+    from asgiref.wsgi import WsgiToAsgi
+    from django.core.wsgi import get_wsgi_application
+
+    application = WsgiToAsgi(get_wsgi_application())
+else:
+    application = get_asgi_application()
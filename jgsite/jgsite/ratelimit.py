@@ -0,0 +1,89 @@
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.shortcuts import render
+
+# Flood protection for the write views. Every limited view has a bucket of
+# requests per user and one per client IP, given as 'count/period' with a
+# period of s, m, h or d (or a number of seconds), and overridable per
+# view with the RATELIMITS setting:
+#
+#     RATELIMITS = {'reply_topic': {'user': '20/m', 'ip': '60/m'}}
+#
+# A bucket is a counter in the RATELIMIT_CACHE_ALIAS cache, keyed by the
+# current period, that refills completely when the period rolls over. An
+# allowed request costs one atomic cache incr per bucket. Requests over
+# the limit get a 429 with Retry-After. RATELIMIT_ENABLE = False turns
+# limiting off, e.g. for benchmarks. The client IP is read from
+# request.META[RATELIMIT_IP_META], REMOTE_ADDR unless behind a proxy.
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    '''Return `(count, seconds)` for a rate such as '10/m' or '100/3600'.'''
+    count, period = rate.split('/')
+    return int(count), PERIODS[period] if period in PERIODS else int(period)
+
+
+def get_cache():
+    return caches[getattr(settings, 'RATELIMIT_CACHE_ALIAS', 'default')]
+
+
+def client_ip(request):
+    value = request.META.get(getattr(settings, 'RATELIMIT_IP_META', 'REMOTE_ADDR'), '')
+    # X-Forwarded-For style headers list the client first.
+    return value.split(',')[0].strip()
+
+
+def hit(cache, key, rate):
+    '''
+    Take one request from the bucket `key`. Return 0 if it was allowed,
+    otherwise the seconds until the bucket refills.
+    '''
+    count, period = parse_rate(rate)
+    now = time.time()
+    window = int(now // period)
+    bucket = 'ratelimit:{0}:{1}'.format(key, window)
+    try:
+        used = cache.incr(bucket)
+    except ValueError:
+        # First request of the period. add() only succeeds for one of
+        # several concurrent requests; the others count with incr.
+        if cache.add(bucket, 1, period + 1):
+            used = 1
+        else:
+            used = cache.incr(bucket)
+    if used <= count:
+        return 0
+    return (window + 1) * period - now
+
+
+def ratelimit(name, user=None, ip=None, methods=('POST',)):
+    '''
+    Limit `methods` requests to the decorated view to the `user` and `ip`
+    rates, unless RATELIMITS['<name>'] overrides them. A rate of None
+    means no limit on that bucket; anonymous requests only have an IP
+    bucket.
+    '''
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method in methods and getattr(settings, 'RATELIMIT_ENABLE', True):
+                rates = dict({'user': user, 'ip': ip}, **getattr(settings, 'RATELIMITS', {}).get(name, {}))
+                cache = get_cache()
+                retry_after = 0
+                if rates['user'] and request.user.is_authenticated:
+                    retry_after = hit(cache, '{0}:user:{1}'.format(name, request.user.pk), rates['user'])
+                if rates['ip'] and not retry_after:
+                    retry_after = hit(cache, '{0}:ip:{1}'.format(name, client_ip(request)), rates['ip'])
+                if retry_after:
+                    response = render(request, 'ratelimited.html', status=429)
+                    response['Retry-After'] = str(math.ceil(retry_after))
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
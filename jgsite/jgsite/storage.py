@@ -0,0 +1,114 @@
+"""
+Static files storage for production builds.
+
+Enable it in settings together with the staticfiles app config from
+jgsite.apps, which leaves unused files out of the bundle:
+
+    INSTALLED_APPS = [..., 'jgsite.apps.StaticFilesConfig', ...]  # instead of 'django.contrib.staticfiles'
+    STATICFILES_STORAGE = 'jgsite.storage.PipelineStaticFilesStorage'
+
+`collectstatic` then writes content-hashed copies of every file, which
+can be served with far-future cache headers, resized WebP variants of
+the carousel images for `srcset`, and pre-compressed `.gz` and `.br`
+siblings of CSS, JS and SVG files for the web server to send as they are
+(nginx `gzip_static` / `brotli_static`). WebP needs Pillow and brotli
+needs the brotli package; each step is skipped when its package is
+missing.
+"""
+import gzip
+import io
+import os
+from fnmatch import fnmatch
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+COMPRESSED_EXTENSIONS = ('.css', '.js', '.svg')
+RESPONSIVE_IMAGES = ('carousel/*.jpg',)
+RESPONSIVE_WIDTHS = (480, 960, 1440, 1920)
+
+
+def variant_name(name, width):
+    '''carousel/DSC07243_1920x515.jpg -> carousel/DSC07243_1920x515-960w.webp'''
+    return '{0}-{1}w.webp'.format(os.path.splitext(name)[0], width)
+
+
+class PipelineStaticFilesStorage(ManifestStaticFilesStorage):
+    # Django 4.0+ also rewrites sourceMappingURL comments and fails on the
+    # ones whose map is not shipped (js/popper.min.js), so only url() and
+    # @import references are rewritten, as on Django 2.1.
+    patterns = tuple(
+        (extension, tuple(pattern for pattern in extension_patterns if 'sourceMappingURL' not in str(pattern)))
+        for extension, extension_patterns in ManifestStaticFilesStorage.patterns
+    )
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        if Image is not None:
+            for name in sorted(paths):
+                if self.is_responsive_image(name):
+                    yield from self.save_variants(name)
+            self.save_manifest()
+        for name in list(paths) + list(self.hashed_files.values()):
+            if name.lower().endswith(COMPRESSED_EXTENSIONS):
+                self.compress(name)
+
+    def is_responsive_image(self, name):
+        patterns = getattr(settings, 'STATICFILES_RESPONSIVE_IMAGES', RESPONSIVE_IMAGES)
+        return any(fnmatch(name.lower(), pattern) for pattern in patterns)
+
+    def save_variants(self, name):
+        '''
+        Save a WebP copy of image `name` for every configured width up to
+        its own, under both its plain and its hashed name.
+        '''
+        with self.open(name) as source:
+            image = Image.open(source)
+            image.load()
+        image = image.convert('RGB')
+        for width in getattr(settings, 'STATICFILES_RESPONSIVE_WIDTHS', RESPONSIVE_WIDTHS):
+            if width > image.width:
+                continue
+            height = round(image.height * width / image.width)
+            output = io.BytesIO()
+            image.resize((width, height), Image.LANCZOS).save(output, 'WEBP', quality=80, method=6)
+            content = ContentFile(output.getvalue())
+            variant = variant_name(name, width)
+            hashed = self.hashed_name(variant, content)
+            for target in (variant, hashed):
+                self.replace(target, content)
+            self.hashed_files[self.hash_key(variant)] = hashed
+            yield variant, hashed, True
+
+    def compress(self, name):
+        with self.open(name) as source:
+            data = source.read()
+        output = io.BytesIO()
+        with gzip.GzipFile(filename='', mode='wb', fileobj=output, compresslevel=9, mtime=0) as compressed:
+            compressed.write(data)
+        variants = [('.gz', output.getvalue())]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(data)))
+        for extension, compressed in variants:
+            # Small files may not shrink, and then are not worth a variant.
+            if len(compressed) < len(data):
+                self.replace(name + extension, ContentFile(compressed))
+
+    def replace(self, name, content):
+        if self.exists(name):
+            self.delete(name)
+        content.seek(0)
+        self._save(name, content)
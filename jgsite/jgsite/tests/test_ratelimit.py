@@ -0,0 +1,104 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from boards.models import Board, Post, Topic
+
+from ..ratelimit import parse_rate, ratelimit
+
+
+@ratelimit('test', user='2/m', ip='3/m')
+def view(request):
+    return HttpResponse('ok')
+
+
+class RateLimitTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username='john', email='john@doe.com', password='123')
+
+    def request(self, method='post', user=None, ip='10.0.0.1'):
+        request = getattr(self.factory, method)('/', REMOTE_ADDR=ip)
+        request.user = user or AnonymousUser()
+        return request
+
+
+class RateLimitTests(RateLimitTestCase):
+    def test_parse_rate(self):
+        self.assertEquals(parse_rate('10/m'), (10, 60))
+        self.assertEquals(parse_rate('5/h'), (5, 3600))
+        self.assertEquals(parse_rate('100/30'), (100, 30))
+
+    def test_user_bucket(self):
+        statuses = [view(self.request(user=self.user, ip='10.0.0.{0}'.format(i))).status_code for i in range(3)]
+        self.assertEquals(statuses, [200, 200, 429])
+
+    def test_ip_bucket(self):
+        statuses = [view(self.request()).status_code for _ in range(4)]
+        self.assertEquals(statuses, [200, 200, 200, 429])
+        self.assertEquals(view(self.request(ip='10.0.0.2')).status_code, 200)
+
+    def test_retry_after(self):
+        for _ in range(3):
+            view(self.request())
+        response = view(self.request())
+        self.assertEquals(response.status_code, 429)
+        self.assertTrue(1 <= int(response['Retry-After']) <= 60)
+        self.assertContains(response, 'Too many requests', status_code=429)
+
+    def test_only_limits_writes(self):
+        statuses = [view(self.request('get')).status_code for _ in range(5)]
+        self.assertEquals(statuses, [200] * 5)
+
+    @override_settings(RATELIMITS={'test': {'ip': '1/m'}})
+    def test_settings_override(self):
+        self.assertEquals([view(self.request()).status_code for _ in range(2)], [200, 429])
+
+    @override_settings(RATELIMIT_ENABLE=False)
+    def test_disabled(self):
+        self.assertEquals([view(self.request()).status_code for _ in range(5)], [200] * 5)
+
+    @override_settings(RATELIMITS={'test': {'user': '1000000/m', 'ip': '1000000/m'}})
+    def test_overhead(self):
+        request = self.request(user=self.user)
+        plain = view.__wrapped__
+        started = time.perf_counter()
+        for _ in range(1000):
+            plain(request)
+        baseline = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(1000):
+            view(request)
+        overhead = (time.perf_counter() - started - baseline) / 1000
+        self.assertLess(overhead, 0.001)
+
+
+class RateLimitedViewsTests(RateLimitTestCase):
+    @override_settings(RATELIMITS={'reply_topic': {'user': '1/m'}}, BOARDS_VIEW_COUNT_FLUSH_INTERVAL=3600)
+    def test_reply_topic(self):
+        board = Board.objects.create(name='Django', description='Django board.')
+        topic = Topic.objects.create(subject='Hello, world', board=board, starter=self.user)
+        url = reverse('boards:reply_topic', kwargs={'board_id': board.pk, 'topic_id': topic.pk})
+        self.client.login(username='john', password='123')
+        self.assertEquals(self.client.post(url, {'message': 'First'}).status_code, 302)
+        self.assertEquals(self.client.post(url, {'message': 'Second'}).status_code, 429)
+        self.assertEquals(Post.objects.count(), 1)
+
+    @override_settings(RATELIMITS={'login': {'ip': '2/m'}})
+    def test_login(self):
+        url = reverse('accounts:login')
+        statuses = [
+            self.client.post(url, {'username': 'john', 'password': 'wrong'}).status_code for _ in range(3)
+        ]
+        self.assertEquals(statuses, [200, 200, 429])
+        self.assertEquals(self.client.get(url).status_code, 200)
+
+    def test_signup(self):
+        url = reverse('accounts:signup')
+        statuses = [self.client.post(url, {}).status_code for _ in range(6)]
+        self.assertEquals(statuses, [200] * 5 + [429])
@@ -0,0 +1,76 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import skipIf
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, modify_settings, override_settings
+
+from .. import storage
+
+
+@modify_settings(INSTALLED_APPS={'remove': 'django.contrib.staticfiles', 'append': 'jgsite.apps.StaticFilesConfig'})
+class StaticPipelineTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        with override_settings(
+            STATIC_ROOT=cls.root,
+            STATICFILES_STORAGE='jgsite.storage.PipelineStaticFilesStorage',
+            STATICFILES_RESPONSIVE_WIDTHS=(480, 960),
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0, stdout=StringIO())
+        cls.files = set()
+        for directory, _, names in os.walk(cls.root):
+            cls.files.update(os.path.relpath(os.path.join(directory, name), cls.root) for name in names)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+        super().tearDownClass()
+
+    def hashed(self, name):
+        root, extension = os.path.splitext(name)
+        return [path for path in self.files if path.startswith(root + '.') and path.endswith(extension)
+                and len(path) == len(name) + 13]
+
+    def test_hashed_names(self):
+        self.assertEquals(len(self.hashed('css/app.css')), 1)
+        self.assertIn('staticfiles.json', self.files)
+
+    def test_unused_files_left_out(self):
+        for path in self.files:
+            self.assertNotIn('/junk/', '/' + path)
+            self.assertNotIn('/save/', '/' + path)
+        self.assertNotIn('css/bootstrap.css', self.files)
+        self.assertNotIn('js/bootstrap.bundle.js', self.files)
+        self.assertIn('css/bootstrap.min.css', self.files)
+
+    def test_gzip(self):
+        hashed = self.hashed('css/bootstrap.min.css')[0]
+        for name in ('css/bootstrap.min.css', hashed):
+            with open(os.path.join(self.root, name), 'rb') as original:
+                with gzip.open(os.path.join(self.root, name + '.gz')) as compressed:
+                    self.assertEquals(compressed.read(), original.read())
+        self.assertNotIn('img/gravel.png.gz', self.files)
+
+    @skipIf(storage.brotli is None, 'brotli is not installed')
+    def test_brotli(self):
+        self.assertIn('js/jquery-3.4.0.min.js.br', self.files)
+
+    @skipIf(storage.Image is None, 'Pillow is not installed')
+    def test_webp_variants(self):
+        for width in (480, 960):
+            name = 'carousel/DSC07203_1920x515-{0}w.webp'.format(width)
+            self.assertIn(name, self.files)
+            self.assertEquals(len(self.hashed(name)), 1)
+            with storage.Image.open(os.path.join(self.root, name)) as image:
+                self.assertEquals(image.format, 'WEBP')
+                self.assertEquals(image.width, width)
+        with open(os.path.join(self.root, 'staticfiles.json')) as manifest:
+            self.assertIn('carousel/DSC07203_1920x515-960w.webp', json.load(manifest)['paths'])
+        self.assertNotIn('carousel/DSC07203_1920x515-1920w.webp', self.files)